@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Optional
 
 from app.core.database import get_db
 from app.models.dataset import Dataset
 from app.models.processing_job import ProcessingJob
+from app.services.job_queue import enqueue_job
 from app.services.analysis_service import AnalysisService
-from app.ml.data_analyzer import DataQualityAnalyzer
+from app.ml.data_analyzer import DataQualityAnalyzer, ANALYSIS_SECTIONS, SUMMARY_DEPENDENCIES
 
 router = APIRouter()
 
@@ -14,13 +16,12 @@ router = APIRouter()
 @router.post("/{dataset_id}/analyze")
 async def analyze_dataset(
     dataset_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Analyze dataset quality and generate comprehensive report
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
@@ -33,16 +34,11 @@ async def analyze_dataset(
     )
 
     db.add(job)
-    db.commit()
-    db.refresh(job)
-
-    # Start analysis in background
-    background_tasks.add_task(
-        AnalysisService.run_analysis,
-        dataset_id,
-        job.id,
-        db
-    )
+    await db.commit()
+    await db.refresh(job)
+
+    # Queue analysis for the background workers
+    await enqueue_job(job.id, dataset_id, "analyze")
 
     return {
         "message": "Analysis started",
@@ -54,21 +50,24 @@ async def analyze_dataset(
 @router.get("/{dataset_id}/analysis")
 async def get_analysis_results(
     dataset_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get analysis results for a dataset
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     # Get latest analysis job
-    job = db.query(ProcessingJob).filter(
-        ProcessingJob.dataset_id == dataset_id,
-        ProcessingJob.job_type == "analyze"
-    ).order_by(ProcessingJob.created_at.desc()).first()
+    result = await db.execute(
+        select(ProcessingJob).where(
+            ProcessingJob.dataset_id == dataset_id,
+            ProcessingJob.job_type == "analyze"
+        ).order_by(ProcessingJob.created_at.desc()).limit(1)
+    )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="No analysis found")
@@ -99,28 +98,46 @@ async def get_analysis_results(
 @router.post("/{dataset_id}/analyze/sync")
 async def analyze_dataset_sync(
     dataset_id: int,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated report sections to compute"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Analyze dataset synchronously (for smaller datasets)
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
+    sections = None
+    if fields:
+        sections = sorted({field.strip() for field in fields.split(",") if field.strip()})
+        unknown = set(sections) - set(ANALYSIS_SECTIONS) - set(SUMMARY_DEPENDENCIES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {sorted(unknown)}")
+        # Scoring is cheap once its sections are computed anyway, so the
+        # dataset's score is refreshed too; it never pulls in extra sections
+        if set(SUMMARY_DEPENDENCIES["quality_score"]) <= set(sections):
+            sections = sorted(set(sections) | {"quality_score"})
+
     try:
         # Run analysis synchronously
-        results = AnalysisService.analyze_dataset_sync(dataset.file_path)
-
-        # Update dataset with quality metrics
-        dataset.quality_score = results.get("quality_score", 0.0)
-        dataset.missing_values_count = results.get("missing_data", {}).get("total_missing", 0)
-        dataset.duplicate_rows_count = results.get("duplicates", {}).get("exact_duplicates", 0)
-        dataset.outlier_count = results.get("outliers", {}).get("combined", {}).get("total_outliers", 0)
+        results = AnalysisService.analyze_dataset_sync(
+            dataset.file_path, dataset.content_hash, sections, dataset.column_info
+        )
+
+        # Update dataset with the quality metrics this run computed
+        if "quality_score" in results:
+            dataset.quality_score = results["quality_score"]
+        if "missing_data" in results:
+            dataset.missing_values_count = results["missing_data"].get("total_missing", 0)
+        if "duplicates" in results:
+            dataset.duplicate_rows_count = results["duplicates"].get("exact_duplicates", 0)
+        if "outliers" in results:
+            dataset.outlier_count = results["outliers"].get("combined", {}).get("total_outliers", 0)
         dataset.status = "analyzed"
 
-        db.commit()
+        await db.commit()
 
         return {
             "message": "Analysis completed",
@@ -135,29 +152,33 @@ async def analyze_dataset_sync(
 @router.get("/{dataset_id}/analysis/visualizations")
 async def get_analysis_visualizations(
     dataset_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get visualization data for analysis results
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     # Get latest analysis job
-    job = db.query(ProcessingJob).filter(
-        ProcessingJob.dataset_id == dataset_id,
-        ProcessingJob.job_type == "analyze",
-        ProcessingJob.status == "completed"
-    ).order_by(ProcessingJob.created_at.desc()).first()
+    result = await db.execute(
+        select(ProcessingJob).where(
+            ProcessingJob.dataset_id == dataset_id,
+            ProcessingJob.job_type == "analyze",
+            ProcessingJob.status == "completed"
+        ).order_by(ProcessingJob.created_at.desc()).limit(1)
+    )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="No completed analysis found")
 
     try:
-        # Generate visualizations
+        # Generate visualizations from the stored results
         analyzer = DataQualityAnalyzer()
+        analyzer.analysis_results = job.results or {}
         visualizations = analyzer.generate_visualizations()
 
         return {
@@ -172,93 +193,35 @@ async def get_analysis_visualizations(
 @router.get("/{dataset_id}/analysis/recommendations")
 async def get_analysis_recommendations(
     dataset_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get data quality improvement recommendations
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     # Get latest analysis job
-    job = db.query(ProcessingJob).filter(
-        ProcessingJob.dataset_id == dataset_id,
-        ProcessingJob.job_type == "analyze",
-        ProcessingJob.status == "completed"
-    ).order_by(ProcessingJob.created_at.desc()).first()
+    result = await db.execute(
+        select(ProcessingJob).where(
+            ProcessingJob.dataset_id == dataset_id,
+            ProcessingJob.job_type == "analyze",
+            ProcessingJob.status == "completed"
+        ).order_by(ProcessingJob.created_at.desc()).limit(1)
+    )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="No completed analysis found")
 
     results = job.results
 
-    # Generate recommendations
-    recommendations = []
-
-    # Missing data recommendations
-    missing_data = results.get("missing_data", {})
-    missing_pct = missing_data.get("missing_percentage", 0)
-
-    if missing_pct > 5:
-        recommendations.append({
-            "type": "missing_data",
-            "severity": "high" if missing_pct > 20 else "medium",
-            "message": f"High missing data ({missing_pct:.1f}%). Consider imputation strategies.",
-            "suggestions": [
-                "Use mean/median imputation for numeric columns",
-                "Use mode imputation for categorical columns",
-                "Consider KNN imputation for complex patterns"
-            ]
-        })
-
-    # Duplicate recommendations
-    duplicates = results.get("duplicates", {})
-    duplicate_pct = duplicates.get("exact_duplicate_pct", 0)
-
-    if duplicate_pct > 1:
-        recommendations.append({
-            "type": "duplicates",
-            "severity": "high" if duplicate_pct > 10 else "medium",
-            "message": f"Duplicate data detected ({duplicate_pct:.1f}%).",
-            "suggestions": [
-                "Remove exact duplicate rows",
-                "Review near-duplicate rows",
-                "Implement data validation rules"
-            ]
-        })
-
-    # Outlier recommendations
-    outliers = results.get("outliers", {})
-    if "combined" in outliers:
-        total_outliers = outliers["combined"].get("total_outliers", 0)
-        if total_outliers > 0:
-            recommendations.append({
-                "type": "outliers",
-                "severity": "medium",
-                "message": f"Outliers detected ({total_outliers} points).",
-                "suggestions": [
-                    "Review outliers for data entry errors",
-                    "Consider capping outliers using IQR method",
-                    "Use robust statistical methods"
-                ]
-            })
-
-    # Data type recommendations
-    data_types = results.get("data_types", {})
-    for col, analysis in data_types.items():
-        if analysis.get("mixed_types"):
-            recommendations.append({
-                "type": "data_types",
-                "severity": "medium",
-                "message": f"Column '{col}' has mixed data types.",
-                "suggestions": [
-                    "Standardize data format",
-                    "Convert to appropriate data type",
-                    "Handle mixed numeric/string values"
-                ]
-            })
+    # Precomputed by the analysis job; older jobs predate that
+    recommendations = results.get("detailed_recommendations")
+    if recommendations is None:
+        recommendations = AnalysisService.build_recommendations(results)
 
     return {
         "recommendations": recommendations,
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
 from app.core.database import get_db
 from app.models.dataset import Dataset
 from app.models.processing_job import ProcessingJob
+from app.services.job_queue import enqueue_job
 from app.services.cleaning_service import CleaningService
 
 router = APIRouter()
@@ -13,13 +15,12 @@ router = APIRouter()
 @router.post("/{dataset_id}/clean")
 async def clean_dataset(
     dataset_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Clean dataset using AI-powered cleaning pipeline
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
@@ -32,16 +33,11 @@ async def clean_dataset(
     )
 
     db.add(job)
-    db.commit()
-    db.refresh(job)
-
-    # Start cleaning in background
-    background_tasks.add_task(
-        CleaningService.run_cleaning,
-        dataset_id,
-        job.id,
-        db
-    )
+    await db.commit()
+    await db.refresh(job)
+
+    # Queue cleaning for the background workers
+    await enqueue_job(job.id, dataset_id, "clean")
 
     return {
         "message": "Data cleaning started",
@@ -53,21 +49,24 @@ async def clean_dataset(
 @router.get("/{dataset_id}/cleaning")
 async def get_cleaning_results(
     dataset_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get cleaning results for a dataset
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     # Get latest cleaning job
-    job = db.query(ProcessingJob).filter(
-        ProcessingJob.dataset_id == dataset_id,
-        ProcessingJob.job_type == "clean"
-    ).order_by(ProcessingJob.created_at.desc()).first()
+    result = await db.execute(
+        select(ProcessingJob).where(
+            ProcessingJob.dataset_id == dataset_id,
+            ProcessingJob.job_type == "clean"
+        ).order_by(ProcessingJob.created_at.desc()).limit(1)
+    )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="No cleaning job found")
@@ -98,12 +97,12 @@ async def get_cleaning_results(
 @router.post("/{dataset_id}/clean/sync")
 async def clean_dataset_sync(
     dataset_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Clean dataset synchronously (for smaller datasets)
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
@@ -125,22 +124,25 @@ async def clean_dataset_sync(
 @router.get("/{dataset_id}/cleaning/summary")
 async def get_cleaning_summary(
     dataset_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get summary of cleaning operations
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     # Get latest cleaning job
-    job = db.query(ProcessingJob).filter(
-        ProcessingJob.dataset_id == dataset_id,
-        ProcessingJob.job_type == "clean",
-        ProcessingJob.status == "completed"
-    ).order_by(ProcessingJob.created_at.desc()).first()
+    result = await db.execute(
+        select(ProcessingJob).where(
+            ProcessingJob.dataset_id == dataset_id,
+            ProcessingJob.job_type == "clean",
+            ProcessingJob.status == "completed"
+        ).order_by(ProcessingJob.created_at.desc()).limit(1)
+    )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="No completed cleaning job found")
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import pandas as pd
+import asyncio
 import os
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.responses import ndjson_response, wants_ndjson
 from app.models.dataset import Dataset
 from app.models.processing_job import ProcessingJob
 from app.services.dataset_service import DatasetService
@@ -13,52 +17,112 @@ from app.core.config import settings
 
 router = APIRouter()
 
+ALLOWED_EXTENSIONS = frozenset({'.csv', '.xlsx', '.xls', '.parquet'})
+UNSUPPORTED_TYPE_DETAIL = f"File type not supported. Allowed: {sorted(ALLOWED_EXTENSIONS)}"
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+UNLINK_BATCH_SIZE = 128
+
+
+def _remove_if_exists(path: Optional[str]):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+async def _remove_files(paths: List[Optional[str]]):
+    """Unlink files concurrently in worker threads, a bounded batch at a time."""
+    # Deduplicated: a Parquet upload is its own Parquet copy
+    paths = list(dict.fromkeys(path for path in paths if path))
+    for start in range(0, len(paths), UNLINK_BATCH_SIZE):
+        batch = paths[start:start + UNLINK_BATCH_SIZE]
+        await asyncio.gather(*(asyncio.to_thread(_remove_if_exists, path) for path in batch))
+
+
+def _file_download(request: Request, path: str, filename: str, etag: Optional[str] = None) -> Response:
+    """FileResponse with caching headers, or a bare 304 when the client copy is current."""
+    headers = {"Cache-Control": "private, max-age=60"}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+
+    # Without an explicit ETag, Starlette derives one from this stat (mtime + size)
+    response = FileResponse(
+        path=path,
+        filename=filename,
+        media_type='application/octet-stream',
+        headers=headers,
+        stat_result=os.stat(path)
+    )
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in client_etags or response.headers["etag"] in client_etags:
+            return Response(status_code=304, headers={
+                "ETag": response.headers["etag"],
+                "Cache-Control": headers["Cache-Control"]
+            })
+
+    return response
+
 
 @router.post("/upload")
 async def upload_dataset(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a dataset file (CSV, Excel, etc.)
     """
     # Validate file type
-    allowed_extensions = ['.csv', '.xlsx', '.xls', '.parquet']
-    file_extension = os.path.splitext(file.filename)[1].lower()
+    stem, dot, extension = file.filename.rpartition('.')
+    file_extension = (dot + extension).lower()
 
-    if file_extension not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type not supported. Allowed: {allowed_extensions}"
-        )
+    # A bare extension such as ".csv" is a hidden file, not a CSV
+    if not stem or file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=UNSUPPORTED_TYPE_DETAIL)
 
-    # Validate file size
-    if file.size > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Max size: {settings.MAX_FILE_SIZE / (1024*1024)}MB"
-        )
+    too_large = HTTPException(
+        status_code=400,
+        detail=f"File too large. Max size: {settings.MAX_FILE_SIZE / (1024*1024)}MB"
+    )
 
-    try:
-        # Save file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{file.filename}"
-        file_path = os.path.join(settings.UPLOAD_DIR, filename)
+    # Validate declared file size (re-checked while streaming)
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise too_large
 
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{timestamp}_{file.filename}"
+    file_path = os.path.join(settings.UPLOAD_DIR, filename)
+
+    try:
+        # Stream file to disk, hashing and counting bytes in the same pass
+        hasher = DatasetService.content_hasher()
+        file_size = 0
         with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > settings.MAX_FILE_SIZE:
+                    raise too_large
+                hasher.update(chunk)
+                buffer.write(chunk)
 
         # Read and analyze file
-        df = DatasetService.read_file(file_path)
+        df = DatasetService.read_file(file_path, cache_parquet=False)
+        if file_extension == '.parquet':
+            # Already columnar; a second copy would only duplicate it
+            parquet_path = file_path
+        else:
+            parquet_path = await asyncio.to_thread(DatasetService.write_parquet_copy, df, file_path)
 
         # Create dataset record
         dataset = Dataset(
             filename=filename,
             original_filename=file.filename,
             file_path=file_path,
-            file_size=file.size,
+            file_size=file_size,
             file_type=file_extension,
+            content_hash=hasher.hexdigest(),
+            parquet_path=parquet_path,
             row_count=len(df),
             column_count=len(df.columns),
             column_info={col: str(dtype) for col, dtype in df.dtypes.to_dict().items()},
@@ -66,8 +130,8 @@ async def upload_dataset(
         )
 
         db.add(dataset)
-        db.commit()
-        db.refresh(dataset)
+        await db.commit()
+        await db.refresh(dataset)
 
         return {
             "message": "Dataset uploaded successfully",
@@ -79,57 +143,71 @@ async def upload_dataset(
 
     except Exception as e:
         # Clean up file if error occurs
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        await _remove_files([file_path, file_path + ".parquet"])
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _dataset_summary(dataset: Dataset) -> dict:
+    return {
+        "id": dataset.id,
+        "filename": dataset.original_filename,
+        "file_type": dataset.file_type,
+        "shape": (dataset.row_count, dataset.column_count),
+        "quality_score": dataset.quality_score,
+        "status": dataset.status,
+        "created_at": dataset.created_at,
+        "updated_at": dataset.updated_at
+    }
+
+
 @router.get("/")
-async def list_datasets(db: Session = Depends(get_db)):
+async def list_datasets(request: Request, db: AsyncSession = Depends(get_db)):
     """
-    List all uploaded datasets
+    List all uploaded datasets (streamed as NDJSON if requested via Accept)
     """
-    datasets = db.query(Dataset).order_by(Dataset.created_at.desc()).all()
+    statement = select(Dataset).order_by(Dataset.created_at.desc())
+
+    if wants_ndjson(request):
+        return ndjson_response(statement, _dataset_summary)
+
+    datasets = (await db.execute(statement)).scalars().all()
 
     return {
-        "datasets": [
-            {
-                "id": dataset.id,
-                "filename": dataset.original_filename,
-                "file_type": dataset.file_type,
-                "shape": (dataset.row_count, dataset.column_count),
-                "quality_score": dataset.quality_score,
-                "status": dataset.status,
-                "created_at": dataset.created_at,
-                "updated_at": dataset.updated_at
-            }
-            for dataset in datasets
-        ]
+        "datasets": [_dataset_summary(dataset) for dataset in datasets]
     }
 
 
 @router.get("/{dataset_id}")
-async def get_dataset(dataset_id: int, db: Session = Depends(get_db)):
+async def get_dataset(dataset_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get dataset details and preview
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     try:
-        # Read file and get preview
-        df = DatasetService.read_file(dataset.file_path)
-        preview = df.head(10).to_dict('records')
+        # Preview from the Parquet copy so the original isn't re-parsed
+        if dataset.parquet_path and os.path.exists(dataset.parquet_path):
+            preview = DatasetService.read_preview(dataset.parquet_path)
+        else:
+            # Arrow-backed: converted to records without Python string objects
+            df = DatasetService.read_file(dataset.file_path, arrow_dtypes=True)
+            preview = DatasetService.frame_preview(df)
+
+        # Column names and dtypes were recorded at upload
+        column_info = dataset.column_info or {}
 
         return {
             "id": dataset.id,
             "filename": dataset.original_filename,
             "file_type": dataset.file_type,
             "shape": (dataset.row_count, dataset.column_count),
-            "columns": list(df.columns),
-            "dtypes": df.dtypes.to_dict(),
+            "columns": list(column_info),
+            "dtypes": column_info,
             "quality_score": dataset.quality_score,
             "status": dataset.status,
             "preview": preview,
@@ -142,104 +220,89 @@ async def get_dataset(dataset_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/{dataset_id}")
-async def delete_dataset(dataset_id: int, db: Session = Depends(get_db)):
+async def delete_dataset(dataset_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a dataset
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     try:
         # Delete associated processing jobs first
-        jobs = db.query(ProcessingJob).filter(ProcessingJob.dataset_id == dataset_id).all()
+        jobs = (await db.execute(select(ProcessingJob).where(ProcessingJob.dataset_id == dataset_id))).scalars().all()
         for job in jobs:
-            # Delete cleaned files if they exist
-            if job.output_file_path and os.path.exists(job.output_file_path):
-                os.remove(job.output_file_path)
-            db.delete(job)
-
-        # Delete dataset file
-        if os.path.exists(dataset.file_path):
-            os.remove(dataset.file_path)
+            await db.delete(job)
 
         # Delete dataset from database
-        db.delete(dataset)
-        db.commit()
+        await db.delete(dataset)
+        await db.commit()
+
+        # Remove cleaned outputs, the dataset file and its Parquet copy
+        await _remove_files(
+            [job.output_file_path for job in jobs] + [dataset.file_path, dataset.parquet_path]
+        )
 
         return {"message": "Dataset and associated jobs deleted successfully"}
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{dataset_id}/download")
-async def download_dataset(dataset_id: int, db: Session = Depends(get_db)):
+async def download_dataset(dataset_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Download the cleaned dataset file
     """
-    from fastapi.responses import FileResponse
-
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
     # Get the latest cleaning job to find the cleaned file
-    job = db.query(ProcessingJob).filter(
-        ProcessingJob.dataset_id == dataset_id,
-        ProcessingJob.job_type == "clean",
-        ProcessingJob.status == "completed"
-    ).order_by(ProcessingJob.created_at.desc()).first()
+    result = await db.execute(
+        select(ProcessingJob).where(
+            ProcessingJob.dataset_id == dataset_id,
+            ProcessingJob.job_type == "clean",
+            ProcessingJob.status == "completed"
+        ).order_by(ProcessingJob.created_at.desc()).limit(1)
+    )
+    job = result.scalars().first()
 
     if job and job.output_file_path and os.path.exists(job.output_file_path):
-        # Return cleaned file
-        filename = f"cleaned_{dataset.original_filename}"
-        return FileResponse(
-            path=job.output_file_path,
-            filename=filename,
-            media_type='application/octet-stream'
-        )
+        # Return cleaned file, named for its stored format (large outputs are Parquet)
+        name, _ = os.path.splitext(dataset.original_filename)
+        filename = f"cleaned_{name}{os.path.splitext(job.output_file_path)[1]}"
+        return _file_download(request, job.output_file_path, filename)
     elif os.path.exists(dataset.file_path):
         # Return original file if no cleaned version exists
-        return FileResponse(
-            path=dataset.file_path,
-            filename=dataset.original_filename,
-            media_type='application/octet-stream'
-        )
+        return _file_download(request, dataset.file_path, dataset.original_filename,
+                              etag=dataset.content_hash)
     else:
         raise HTTPException(status_code=404, detail="File not found")
 
 
 @router.delete("/")
-async def delete_all_datasets(db: Session = Depends(get_db)):
+async def delete_all_datasets(db: AsyncSession = Depends(get_db)):
     """
     Delete all datasets and their associated jobs
     """
     try:
-        # Get all datasets
-        datasets = db.query(Dataset).all()
-
-        # Delete all processing jobs first
-        all_jobs = db.query(ProcessingJob).all()
-        for job in all_jobs:
-            # Delete cleaned files if they exist
-            if job.output_file_path and os.path.exists(job.output_file_path):
-                os.remove(job.output_file_path)
-            db.delete(job)
+        # Collect files to remove: cleaned outputs, uploads and their Parquet copies
+        paths = list((await db.execute(select(ProcessingJob.output_file_path))).scalars())
+        for file_path, parquet_path in await db.execute(select(Dataset.file_path, Dataset.parquet_path)):
+            paths.extend((file_path, parquet_path))
 
-        # Delete all dataset files and records
-        for dataset in datasets:
-            # Delete dataset file
-            if os.path.exists(dataset.file_path):
-                os.remove(dataset.file_path)
-            db.delete(dataset)
+        # Bulk delete, jobs first
+        jobs_deleted = (await db.execute(delete(ProcessingJob))).rowcount
+        datasets_deleted = (await db.execute(delete(Dataset))).rowcount
+        await db.commit()
 
-        db.commit()
+        await _remove_files(paths)
 
-        return {"message": f"Successfully deleted {len(datasets)} datasets and {len(all_jobs)} jobs"}
+        return {"message": f"Successfully deleted {datasets_deleted} datasets and {jobs_deleted} jobs"}
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
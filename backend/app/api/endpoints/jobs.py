@@ -1,49 +1,78 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
 
 from app.core.database import get_db
+from app.core.responses import ndjson_response, wants_ndjson
 from app.models.processing_job import ProcessingJob
 from app.models.dataset import Dataset
 
 router = APIRouter()
 
+# Columns needed for job listings; skips the large results/metrics JSON
+JOB_SUMMARY_COLUMNS = (
+    ProcessingJob.id,
+    ProcessingJob.dataset_id,
+    ProcessingJob.job_type,
+    ProcessingJob.status,
+    ProcessingJob.progress,
+    ProcessingJob.created_at,
+    ProcessingJob.started_at,
+    ProcessingJob.completed_at,
+)
+
+
+def _job_summary(job: ProcessingJob) -> dict:
+    return {
+        "id": job.id,
+        "dataset_id": job.dataset_id,
+        "dataset_name": job.dataset.original_filename if job.dataset else None,
+        "job_type": job.job_type,
+        "status": job.status,
+        "progress": job.progress,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "completed_at": job.completed_at
+    }
+
 
 @router.get("/")
-async def list_jobs(db: Session = Depends(get_db)):
+async def list_jobs(request: Request, db: AsyncSession = Depends(get_db)):
     """
-    List all processing jobs
+    List all processing jobs (streamed as NDJSON if requested via Accept)
     """
-    jobs = db.query(ProcessingJob).order_by(ProcessingJob.created_at.desc()).all()
+    statement = select(ProcessingJob).options(
+        load_only(*JOB_SUMMARY_COLUMNS),
+        selectinload(ProcessingJob.dataset).load_only(Dataset.original_filename)
+    ).order_by(ProcessingJob.created_at.desc())
+
+    if wants_ndjson(request):
+        return ndjson_response(statement, _job_summary)
+
+    jobs = (await db.execute(statement)).scalars().all()
 
     return {
-        "jobs": [
-            {
-                "id": job.id,
-                "dataset_id": job.dataset_id,
-                "job_type": job.job_type,
-                "status": job.status,
-                "progress": job.progress,
-                "created_at": job.created_at,
-                "started_at": job.started_at,
-                "completed_at": job.completed_at
-            }
-            for job in jobs
-        ]
+        "jobs": [_job_summary(job) for job in jobs]
     }
 
 
 @router.get("/{job_id}")
-async def get_job(job_id: int, db: Session = Depends(get_db)):
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get job details
     """
-    job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+    result = await db.execute(
+        select(ProcessingJob).options(
+            selectinload(ProcessingJob.dataset)
+        ).where(ProcessingJob.id == job_id)
+    )
+    job = result.scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # Get dataset info
-    dataset = db.query(Dataset).filter(Dataset.id == job.dataset_id).first()
+    dataset = job.dataset
 
     return {
         "id": job.id,
@@ -65,18 +94,23 @@ async def get_job(job_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/dataset/{dataset_id}")
-async def get_dataset_jobs(dataset_id: int, db: Session = Depends(get_db)):
+async def get_dataset_jobs(dataset_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get all jobs for a specific dataset
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (await db.execute(select(Dataset).where(Dataset.id == dataset_id))).scalars().first()
 
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    jobs = db.query(ProcessingJob).filter(
-        ProcessingJob.dataset_id == dataset_id
-    ).order_by(ProcessingJob.created_at.desc()).all()
+    result = await db.execute(
+        select(ProcessingJob).options(
+            load_only(*JOB_SUMMARY_COLUMNS)
+        ).where(
+            ProcessingJob.dataset_id == dataset_id
+        ).order_by(ProcessingJob.created_at.desc())
+    )
+    jobs = result.scalars().all()
 
     return {
         "dataset_id": dataset_id,
@@ -97,11 +131,11 @@ async def get_dataset_jobs(dataset_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/{job_id}")
-async def cancel_job(job_id: int, db: Session = Depends(get_db)):
+async def cancel_job(job_id: int, db: AsyncSession = Depends(get_db)):
     """
     Cancel a running job
     """
-    job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
+    job = (await db.execute(select(ProcessingJob).where(ProcessingJob.id == job_id))).scalars().first()
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -113,6 +147,6 @@ async def cancel_job(job_id: int, db: Session = Depends(get_db)):
         )
 
     job.status = "cancelled"
-    db.commit()
+    await db.commit()
 
     return {"message": "Job cancelled successfully"}
@@ -20,11 +20,15 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
     UPLOAD_DIR: str = os.path.join(os.path.dirname(__file__), "..", "..", "storage", "uploads")
+    # Memory-map local Parquet files on read instead of copying them into memory
+    PARQUET_MEMORY_MAP: bool = True
 
     # ML Settings
     ML_MODEL_CACHE_DIR: str = os.path.join(os.path.dirname(__file__), "..", "..", "storage", "models")
     LOG_DIR: str = os.path.join(os.path.dirname(__file__), "..", "..", "storage", "logs")
     MAX_WORKERS: int = 4
+    # Cleaned frames with more cells than this are saved as Parquet instead of their upload format
+    CLEANED_PARQUET_MIN_CELLS: int = 10_000_000
 
     # Debug
     DEBUG: bool = True
@@ -36,8 +40,16 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-# Ensure directories exist
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-os.makedirs(settings.ML_MODEL_CACHE_DIR, exist_ok=True)
-os.makedirs(settings.LOG_DIR, exist_ok=True)
-os.makedirs(os.path.dirname(settings.DATABASE_URL.replace("sqlite:///./", "")), exist_ok=True)
+
+def ensure_dirs(*extra_dirs: str):
+    """Create storage directories that don't exist yet; run once at startup."""
+    dirs = [
+        settings.UPLOAD_DIR,
+        settings.ML_MODEL_CACHE_DIR,
+        settings.LOG_DIR,
+        os.path.dirname(settings.DATABASE_URL.replace("sqlite:///./", "")),
+        *extra_dirs,
+    ]
+    for path in dirs:
+        if path and not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
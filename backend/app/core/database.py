@@ -1,8 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+
+# Sync engine: table creation and background jobs running in worker threads
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
@@ -10,12 +22,51 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers, so queries don't block the event loop
+async_engine = create_async_engine(_async_database_url(settings.DATABASE_URL))
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 Base = declarative_base()
 
+# Columns added to existing tables after those tables first shipped, as
+# (table, column). create_all only creates missing tables, so upgrade_schema
+# adds these to older databases on startup.
+ADDED_COLUMNS = [
+    ("datasets", "content_hash"),
+    ("datasets", "parquet_path"),
+]
+
+
+def upgrade_schema(bind=None):
+    """
+    Bring an existing database up to the models; safe to rerun.
+
+    Adds any ADDED_COLUMNS a table lacks, then creates every index declared
+    on the models that is missing, which create_all skips for tables that
+    already exist.
+    """
+    with (bind or engine).begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = [
+            table for table in Base.metadata.sorted_tables if inspector.has_table(table.name)
+        ]
+
+        for table_name, column_name in ADDED_COLUMNS:
+            if not inspector.has_table(table_name):
+                continue
+            if column_name in {column["name"] for column in inspector.get_columns(table_name)}:
+                continue
+
+            column = Base.metadata.tables[table_name].c[column_name]
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+
+        for table in existing_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
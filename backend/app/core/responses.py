@@ -0,0 +1,62 @@
+from typing import Any, Callable
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.core.database import AsyncSessionLocal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 1000
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Fallback for values orjson cannot encode itself."""
+    if isinstance(obj, np.ndarray):  # object or non-contiguous arrays
+        return obj.tolist()
+    if isinstance(obj, (np.dtype, pd.api.extensions.ExtensionDtype)):
+        return str(obj)
+    if pd.api.types.is_scalar(obj) and pd.isna(obj):  # pd.NA, pd.NaT
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if hasattr(obj, "item"):  # remaining numpy/pandas scalars
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def to_jsonable(obj: Any) -> Any:
+    """Convert numpy/pandas values in a nested structure to plain JSON types (NaN becomes None)."""
+    return orjson.loads(orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS))
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; handles numpy values, datetimes and NaN natively."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Whether the client asked for newline-delimited JSON."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(statement: Select, serialize: Callable[[Any], dict]) -> StreamingResponse:
+    """
+    Stream ORM rows as one JSON object per line.
+
+    Rows are fetched in batches from a server-side cursor on a session owned
+    by the stream, since the request's session closes before the body is sent.
+    """
+    async def lines():
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(statement.execution_options(yield_per=NDJSON_BATCH_SIZE))
+            async for row in result.scalars():
+                yield orjson.dumps(serialize(row)) + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
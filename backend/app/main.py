@@ -1,22 +1,49 @@
+from contextlib import asynccontextmanager
+import asyncio
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 import uvicorn
 
 from app.api.routes import api_router
-from app.core.config import settings
-from app.core.database import engine
+from app.core.config import settings, ensure_dirs
+from app.core.database import engine, async_engine, upgrade_schema
+from app.core.responses import ORJSONResponse
 from app.models import Base
+from app.services.job_queue import start_workers, stop_workers
+
+static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Storage directories and database tables
+    await asyncio.to_thread(ensure_dirs, static_dir)
+    await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+    # Columns added since an existing database was created
+    await asyncio.to_thread(upgrade_schema)
+
+    # Refresh planner statistics so SQLite picks up the composite job index
+    if async_engine.dialect.name == "sqlite":
+        async with async_engine.begin() as conn:
+            await conn.execute(text("ANALYZE"))
+
+    # Fixed pool of background job workers
+    workers = start_workers()
+    yield
+    await stop_workers(workers)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="AutoDataFix API",
     description="AI-Powered Data Quality System",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -31,12 +58,8 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
-# Mount static files (create directory if it doesn't exist)
-import os
-static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
-if not os.path.exists(static_dir):
-    os.makedirs(static_dir, exist_ok=True)
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+# Mount static files (directory is created in lifespan)
+app.mount("/static", StaticFiles(directory=static_dir, check_dir=False), name="static")
 
 @app.get("/")
 async def root():
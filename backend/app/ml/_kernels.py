@@ -0,0 +1,193 @@
+"""
+Numeric kernels shared by the analyzer and cleaner.
+
+Kernels are compiled with Numba when it is installed and run as plain
+NumPy otherwise, so they must stay within the nopython-compatible subset.
+Inputs are 2-D float64 arrays (rows x columns) with NaN marking missing
+values; pass them Fortran-ordered so each column is contiguous unless a
+kernel says otherwise.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True, parallel=True)
+def statistical_outlier_masks(values):
+    """
+    Per-column IQR fences and IQR, z-score and modified z-score outlier masks.
+
+    Returns (counts, bounds, iqr_mask, zscore_mask, modified_zscore_mask):
+    counts[j] is the number of present values in column j; bounds[j] is
+    (lower, upper) for column j, NaN when the column has no values; each
+    mask[i, j] is True when row i of column j is flagged by that method
+    (|z| > 3 with population std, |0.6745 (x - median) / MAD| > 3.5).
+    Missing values are never flagged.
+    """
+    n_rows, n_cols = values.shape
+    counts = np.zeros(n_cols, dtype=np.int64)
+    bounds = np.full((n_cols, 2), np.nan)
+    iqr_mask = np.zeros((n_rows, n_cols), dtype=np.bool_)
+    zscore_mask = np.zeros((n_rows, n_cols), dtype=np.bool_)
+    modified_mask = np.zeros((n_rows, n_cols), dtype=np.bool_)
+
+    for j in prange(n_cols):
+        col = values[:, j]
+        present = col[~np.isnan(col)]
+        counts[j] = present.size
+        if present.size == 0:
+            continue
+
+        q1 = np.percentile(present, 25.0)
+        q3 = np.percentile(present, 75.0)
+        iqr = q3 - q1
+        lower = q1 - 1.5 * iqr
+        upper = q3 + 1.5 * iqr
+        bounds[j, 0] = lower
+        bounds[j, 1] = upper
+
+        mean = present.mean()
+        std = present.std()
+        median = np.median(present)
+        mad = np.median(np.abs(present - median))
+
+        # One pass over the column for all three tests; comparisons with
+        # NaN are False, so missing rows stay unflagged
+        for i in range(n_rows):
+            x = col[i]
+            iqr_mask[i, j] = (x < lower) or (x > upper)
+            if std > 0:
+                zscore_mask[i, j] = abs(x - mean) / std > 3.0
+            if mad > 0:
+                modified_mask[i, j] = abs(0.6745 * (x - median) / mad) > 3.5
+            else:
+                # Zero MAD: any value off the median has an infinite score
+                modified_mask[i, j] = x != median and not np.isnan(x)
+
+    return counts, bounds, iqr_mask, zscore_mask, modified_mask
+
+
+@njit(cache=True, parallel=True)
+def knn_impute(values, targets, n_neighbors):
+    """
+    Fill missing values in the target columns from the nearest rows.
+
+    Follows sklearn's KNNImputer with uniform weights: rows are compared by
+    nan-euclidean distance over all columns (squared differences summed over
+    the columns both rows have, scaled by n_cols / n_common), and a missing
+    value in column c is the mean of c over the n_neighbors closest rows that
+    have c. Rows sharing no column are never neighbours; when no neighbour
+    exists the column mean is used. Takes row-major input so each distance
+    reads contiguous rows; returns a (rows x targets) array. Rows are
+    imputed in parallel, one distance vector per row shared by all targets.
+    """
+    n_rows, n_cols = values.shape
+    n_targets = targets.size
+    imputed = np.empty((n_rows, n_targets))
+    missing = np.zeros((n_rows, n_targets), dtype=np.bool_)
+    donor_counts = np.zeros(n_targets, dtype=np.int64)
+    means = np.zeros(n_targets)
+
+    for t in range(n_targets):
+        col = values[:, targets[t]]
+        imputed[:, t] = col
+        missing[:, t] = np.isnan(col)
+        present = col[~missing[:, t]]
+        donor_counts[t] = present.size
+        if present.size > 0:
+            means[t] = present.mean()
+
+    receivers = np.flatnonzero(missing.sum(axis=1) > 0)
+
+    for ri in prange(receivers.size):
+        r = receivers[ri]
+
+        # Squared distances are enough to rank neighbours
+        distances = np.full(n_rows, np.nan)
+        for i in range(n_rows):
+            total = 0.0
+            common = 0
+            for j in range(n_cols):
+                diff = values[r, j] - values[i, j]
+                if not np.isnan(diff):
+                    total += diff * diff
+                    common += 1
+            if common > 0:
+                distances[i] = total * n_cols / common
+
+        for t in range(n_targets):
+            if not missing[r, t]:
+                continue
+            c = targets[t]
+            k = min(n_neighbors, donor_counts[t])
+            nearest = np.full(k, np.inf)
+            nearest_values = np.zeros(k)
+            found = 0
+
+            # Keep the k closest donors sorted by insertion
+            for i in range(n_rows):
+                distance = distances[i]
+                if np.isnan(distance) or np.isnan(values[i, c]):
+                    continue
+                if found < k:
+                    found += 1
+                elif distance >= nearest[k - 1]:
+                    continue
+                pos = found - 1
+                while pos > 0 and nearest[pos - 1] > distance:
+                    nearest[pos] = nearest[pos - 1]
+                    nearest_values[pos] = nearest_values[pos - 1]
+                    pos -= 1
+                nearest[pos] = distance
+                nearest_values[pos] = values[i, c]
+
+            imputed[r, t] = nearest_values[:found].mean() if found > 0 else means[t]
+
+    return imputed
+
+
+@njit(cache=True, parallel=True)
+def clip_outliers(values, lower, upper):
+    """
+    Clip each column in place to its (lower[j], upper[j]) bounds.
+
+    Returns the number of values clipped per column. Missing values and
+    NaN bounds never clip. Columns are processed in parallel, one pass each.
+    """
+    n_rows, n_cols = values.shape
+    counts = np.zeros(n_cols, dtype=np.int64)
+
+    for j in prange(n_cols):
+        low = lower[j]
+        high = upper[j]
+        clipped = 0
+        for i in range(n_rows):
+            x = values[i, j]
+            if x < low:
+                values[i, j] = low
+                clipped += 1
+            elif x > high:
+                values[i, j] = high
+                clipped += 1
+        counts[j] = clipped
+
+    return counts
+
+
+def as_column_matrix(df, columns) -> np.ndarray:
+    """
+    Numeric columns as a Fortran-ordered float64 matrix with NaN for missing.
+
+    May be a read-only view of the frame's data; copy it before writing.
+    """
+    return np.asfortranarray(df[columns].to_numpy(dtype=np.float64, na_value=np.nan))
@@ -1,18 +1,69 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 import missingno as msno
 from scipy import stats
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import IsolationForest
 from sklearn.neighbors import LocalOutlierFactor
 from sklearn.svm import OneClassSVM
+from joblib import parallel_backend
+import pyarrow as pa
+import pyarrow.compute as pc
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
+import base64
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+from app.ml._kernels import statistical_outlier_masks, as_column_matrix
+
+# Sections analyze_dataset can compute, in result order
+ANALYSIS_SECTIONS = (
+    "basic_info", "missing_data", "duplicates", "outliers",
+    "data_types", "distributions", "correlations"
+)
+# Summary fields and the sections they are derived from
+SUMMARY_DEPENDENCIES = {
+    "quality_score": ("basic_info", "missing_data", "duplicates", "outliers"),
+    "recommendations": ("missing_data", "duplicates", "outliers", "data_types"),
+}
+# Sections computed from the numeric columns alone
+NUMERIC_SECTIONS = ("outliers", "distributions", "correlations")
+
+# Currency symbols checked for by format-inconsistency detection (RE2 syntax)
+CURRENCY_PATTERN = r'[$€£¥]'
+# Rows sampled to estimate the footprint of object columns
+MEMORY_SAMPLE_ROWS = 1000
+# Cap on row-pair similarities computed at once by near-duplicate detection
+NEAR_DUPLICATE_BLOCK_ELEMENTS = 1 << 22
+# Above this many rows near duplicates are found with cosine LSH instead of
+# an exhaustive screen: bands of hyperplane sign bits per row
+NEAR_DUPLICATE_EXACT_MAX_ROWS = 20_000
+NEAR_DUPLICATE_LSH_BANDS = 16
+NEAR_DUPLICATE_LSH_BITS = 12
+# Candidate pairs beyond which LSH gives up and the exhaustive screen is used
+NEAR_DUPLICATE_LSH_MAX_CANDIDATES = 1 << 25
+# Margin kept when screening correlations in float32 before exact rescoring
+FLOAT32_SCREEN_TOLERANCE = 1e-3
+# Above this many rows, ML outlier models are fit on a sample of this size
+ML_OUTLIER_SAMPLE_ROWS = 10_000
+# Normality tests run on at most this many values; Shapiro-Wilk p-values
+# are unreliable beyond it
+NORMALITY_SAMPLE_SIZE = 5000
+# Heatmaps with more columns than this are sent as a base64 float32 buffer
+HEATMAP_INLINE_MAX_COLUMNS = 50
+# Rows scored per predict call when applying a sample-fitted model
+ML_OUTLIER_CHUNK_ROWS = 50_000
+
 
 class DataQualityAnalyzer:
     """
@@ -22,56 +73,134 @@ class DataQualityAnalyzer:
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
         self.analysis_results = {}
+        self._numeric_cache = None
+        self._pearson_values = None
 
-    def analyze_dataset(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def analyze_dataset(self, df: pd.DataFrame,
+                        sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Comprehensive dataset analysis covering all quality aspects.
+
+        sections limits the work to the named entries of ANALYSIS_SECTIONS
+        and SUMMARY_DEPENDENCIES (e.g. just "quality_score"); the sections a
+        summary depends on are computed and returned with it. All of them
+        are computed by default.
         """
+        requested, needed = self._resolve_sections(sections)
+
+        analyses = {
+            "basic_info": self._analyze_basic_info,
+            "missing_data": self._analyze_missing_data,
+            "duplicates": self._analyze_duplicates,
+            "outliers": self._analyze_outliers,
+            "data_types": self._analyze_data_types,
+            "distributions": self._analyze_distributions,
+            "correlations": self._analyze_correlations,
+        }
         self.analysis_results = {
-            "basic_info": self._analyze_basic_info(df),
-            "missing_data": self._analyze_missing_data(df),
-            "duplicates": self._analyze_duplicates(df),
-            "outliers": self._analyze_outliers(df),
-            "data_types": self._analyze_data_types(df),
-            "distributions": self._analyze_distributions(df),
-            "correlations": self._analyze_correlations(df),
-            "quality_score": 0.0,
-            "recommendations": []
+            section: analyses[section](df)
+            for section in ANALYSIS_SECTIONS if section in needed
         }
 
+        # Don't keep the dataset alive through the cached numeric matrix
+        self._numeric_cache = None
+
         # Calculate overall quality score
-        self.analysis_results["quality_score"] = self._calculate_quality_score()
+        if "quality_score" in requested:
+            self.analysis_results["quality_score"] = self._calculate_quality_score()
 
         # Generate recommendations
-        self.analysis_results["recommendations"] = self._generate_recommendations()
+        if "recommendations" in requested:
+            self.analysis_results["recommendations"] = self._generate_recommendations()
 
         return self.analysis_results
 
+    @staticmethod
+    def _resolve_sections(sections: Optional[Iterable[str]]) -> Tuple[set, set]:
+        """The requested names and the analysis sections they need computed."""
+        requested = set(ANALYSIS_SECTIONS).union(SUMMARY_DEPENDENCIES) if sections is None else set(sections)
+        unknown = requested - set(ANALYSIS_SECTIONS) - set(SUMMARY_DEPENDENCIES)
+        if unknown:
+            raise ValueError(f"Unknown analysis sections: {sorted(unknown)}")
+
+        needed = requested.intersection(ANALYSIS_SECTIONS)
+        for summary, dependencies in SUMMARY_DEPENDENCIES.items():
+            if summary in requested:
+                needed.update(dependencies)
+        return requested, needed
+
+    @staticmethod
+    def columns_needed(dtypes: Dict[str, str],
+                       sections: Optional[Iterable[str]] = None) -> Optional[List[str]]:
+        """
+        Columns analyze_dataset reads for sections, given the dataset's dtypes.
+
+        Only numeric columns when every needed section is in NUMERIC_SECTIONS;
+        None (every column) otherwise, or if a dtype isn't recognized.
+        """
+        _, needed = DataQualityAnalyzer._resolve_sections(sections)
+        if not needed.issubset(NUMERIC_SECTIONS):
+            return None
+        try:
+            # An empty frame selects columns exactly as _numeric_data does
+            empty = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+        except (TypeError, ValueError):
+            return None
+        return empty.select_dtypes(include=[np.number]).columns.tolist()
+
+    def _numeric_data(self, df: pd.DataFrame) -> Tuple[pd.Index, np.ndarray]:
+        """
+        Numeric column labels and their float64 matrix (NaN for missing).
+
+        Computed once per frame and shared by the analyses that need them.
+        """
+        if self._numeric_cache is None or self._numeric_cache[0] is not df:
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            self._numeric_cache = (df, numeric_cols, as_column_matrix(df, numeric_cols))
+        return self._numeric_cache[1], self._numeric_cache[2]
+
     def _analyze_basic_info(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze basic dataset information."""
         return {
             "shape": df.shape,
-            "memory_usage": df.memory_usage(deep=True).sum(),
+            "memory_usage": self._estimate_memory_usage(df),
             "columns": list(df.columns),
             "dtypes": df.dtypes.to_dict(),
             "sample_data": df.head().to_dict()
         }
 
+    def _estimate_memory_usage(self, df: pd.DataFrame) -> int:
+        """Memory footprint in bytes, extrapolating object columns from a row sample."""
+        if len(df) <= MEMORY_SAMPLE_ROWS:
+            return int(df.memory_usage(deep=True).sum())
+
+        total = int(df.memory_usage(deep=False).sum())
+        object_positions = np.flatnonzero((df.dtypes == object).to_numpy())
+        if len(object_positions) > 0:
+            sample = df.iloc[:, object_positions].sample(MEMORY_SAMPLE_ROWS, random_state=0)
+            sampled_bytes = sum(map(sys.getsizeof, sample.to_numpy().ravel()))
+            total += int(sampled_bytes * len(df) / MEMORY_SAMPLE_ROWS)
+
+        return total
+
     def _analyze_missing_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Comprehensive missing data analysis."""
         missing_data = {}
 
-        # Overall missing data
-        total_missing = df.isnull().sum().sum()
-        total_cells = df.size
-        missing_percentage = (total_missing / total_cells) * 100
+        # Missing-value mask, built once for every statistic below
+        missing_mask = df.isnull().to_numpy()
 
         # Per column missing data
-        column_missing = df.isnull().sum()
+        column_missing = pd.Series(missing_mask.sum(axis=0), index=df.columns)
         column_missing_pct = (column_missing / len(df)) * 100
 
+        # Overall missing data
+        total_missing = column_missing.sum()
+        total_cells = df.size
+        missing_percentage = (total_missing / total_cells) * 100
+
         # Missing data patterns
-        missing_patterns = self._identify_missing_patterns(df)
+        missing_patterns = self._identify_missing_patterns(df, missing_mask)
 
         missing_data = {
             "total_missing": total_missing,
@@ -85,19 +214,21 @@ class DataQualityAnalyzer:
 
         return missing_data
 
-    def _identify_missing_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _identify_missing_patterns(self, df: pd.DataFrame,
+                                   missing_mask: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Identify patterns in missing data."""
         patterns = {}
+        if missing_mask is None:
+            missing_mask = df.isnull().to_numpy()
 
         # Check for completely missing columns
-        completely_missing = df.columns[df.isnull().all()].tolist()
+        completely_missing = df.columns[missing_mask.all(axis=0)].tolist()
 
         # Check for rows with all missing values
-        completely_missing_rows = df[df.isnull().all(axis=1)].shape[0]
+        completely_missing_rows = int(missing_mask.all(axis=1).sum())
 
         # Check for missing data clusters
-        missing_matrix = df.isnull()
-        missing_clusters = self._find_missing_clusters(missing_matrix)
+        missing_clusters = self._find_missing_clusters(missing_mask, df.index, df.columns)
 
         patterns = {
             "completely_missing_columns": completely_missing,
@@ -107,31 +238,27 @@ class DataQualityAnalyzer:
 
         return patterns
 
-    def _find_missing_clusters(self, missing_matrix: pd.DataFrame) -> List[Dict]:
+    def _find_missing_clusters(self, missing_mask: np.ndarray, index: pd.Index,
+                               columns: pd.Index) -> List[Dict]:
         """Find clusters of missing data."""
         clusters = []
 
-        # Find consecutive missing values in each column
-        for col in missing_matrix.columns:
-            missing_series = missing_matrix[col]
-            if missing_series.any():
-                # Find start and end of missing sequences
-                missing_starts = missing_series.ne(missing_series.shift()).cumsum()
-                missing_groups = missing_series.groupby(missing_starts)
-
-                for group_id, group in missing_groups:
-                    if group.iloc[0]:  # If it's a missing group
-                        start_idx = group.index[0]
-                        end_idx = group.index[-1]
-                        length = len(group)
-
-                        clusters.append({
-                            "column": col,
-                            "start_index": start_idx,
-                            "end_index": end_idx,
-                            "length": length,
-                            "type": "consecutive"
-                        })
+        # Find consecutive missing values in each column: run boundaries are
+        # where the 0/1 missing indicator changes, padded with 0 at both ends
+        for j, col in enumerate(columns):
+            indicator = missing_mask[:, j].view(np.int8)
+            edges = np.flatnonzero(np.diff(indicator, prepend=0, append=0))
+            starts, stops = edges[0::2], edges[1::2]
+
+            for start_idx, end_idx, length in zip(index[starts], index[stops - 1],
+                                                  (stops - starts).tolist()):
+                clusters.append({
+                    "column": col,
+                    "start_index": start_idx,
+                    "end_index": end_idx,
+                    "length": length,
+                    "type": "consecutive"
+                })
 
         return clusters
 
@@ -146,12 +273,17 @@ class DataQualityAnalyzer:
 
     def _analyze_duplicates(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze duplicate data."""
+        # Equal rows hash equal, so only rows sharing a hash can be duplicates;
+        # those few are compared by value (hashes also match for e.g. 1 and "1")
+        candidates = pd.Series(self._row_hashes(df)).duplicated(keep=False).to_numpy()
+        candidate_rows = df[candidates]
+
         # Exact duplicates
-        exact_duplicates = df.duplicated().sum()
+        exact_duplicates = candidate_rows.duplicated().sum()
         exact_duplicate_pct = (exact_duplicates / len(df)) * 100
 
-        # Duplicate rows
-        duplicate_rows = df[df.duplicated(keep=False)]
+        # Rows belonging to any duplicate group
+        duplicate_rows = candidate_rows.duplicated(keep=False).sum()
 
         # Near duplicates (fuzzy matching)
         near_duplicates = self._find_near_duplicates(df)
@@ -159,39 +291,131 @@ class DataQualityAnalyzer:
         return {
             "exact_duplicates": exact_duplicates,
             "exact_duplicate_pct": exact_duplicate_pct,
-            "duplicate_rows": duplicate_rows.shape[0],
+            "duplicate_rows": duplicate_rows,
             "near_duplicates": near_duplicates,
             "severity": self._assess_duplicate_severity(exact_duplicate_pct)
         }
 
+    def _row_hashes(self, df: pd.DataFrame) -> np.ndarray:
+        """64-bit hash of each row's values; rows duplicated() treats as equal hash equal."""
+        floats = df.dtypes.map(pd.api.types.is_float_dtype).to_numpy()
+        row_hashes = np.zeros(len(df), dtype=np.uint64)
+        # -0.0 equals 0.0 but hashes from different bytes; adding 0.0 normalizes it
+        for part in (df.loc[:, ~floats], df.loc[:, floats] + 0.0):
+            if part.shape[1]:
+                row_hashes ^= pd.util.hash_pandas_object(part, index=False).to_numpy()
+        return row_hashes
+
     def _find_near_duplicates(self, df: pd.DataFrame) -> List[Dict]:
         """Find near-duplicate rows using fuzzy matching."""
         near_duplicates = []
 
         # For now, implement a simple approach
         # In production, you might use more sophisticated fuzzy matching
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols, values = self._numeric_data(df)
 
         if len(numeric_cols) > 0:
-            # Use correlation to find similar rows
-            numeric_df = df[numeric_cols].fillna(0)
-
-            # Find rows with high similarity
-            for i in range(len(numeric_df)):
-                for j in range(i + 1, len(numeric_df)):
-                    similarity = np.corrcoef(
-                        numeric_df.iloc[i], numeric_df.iloc[j]
-                    )[0, 1]
-
-                    if similarity > 0.95:  # High similarity threshold
-                        near_duplicates.append({
-                            "row1": i,
-                            "row2": j,
-                            "similarity": similarity
-                        })
+            # Use correlation to find similar rows: the Pearson correlation of
+            # two rows is the mean product of their row-wise z-scores
+            values = np.where(np.isnan(values), 0.0, values)
+            std = values.std(axis=1, keepdims=True)
+            std[std == 0] = np.nan  # constant rows have no defined correlation
+            z = np.ascontiguousarray((values - values.mean(axis=1, keepdims=True)) / std)
+            n_rows, n_cols = z.shape
+
+            candidates = None
+            if n_rows > NEAR_DUPLICATE_EXACT_MAX_ROWS:
+                candidates = self._lsh_candidate_pairs(z)
+            if candidates is None:
+                candidates = self._screened_candidate_pairs(z)
+
+            # Candidates are rescored in float64 so pairs at the threshold
+            # are decided exactly
+            for rows, cols in candidates:
+                similarity = np.einsum("ij,ij->i", z[rows], z[cols]) / n_cols
+                hits = similarity > 0.95  # High similarity threshold
+
+                for i, j, value in zip(rows[hits].tolist(), cols[hits].tolist(), similarity[hits].tolist()):
+                    near_duplicates.append({
+                        "row1": i,
+                        "row2": j,
+                        "similarity": value
+                    })
 
         return near_duplicates
 
+    @staticmethod
+    def _screened_candidate_pairs(z: np.ndarray):
+        """
+        Yield (rows, cols) arrays of i < j pairs whose float32 correlation is
+        near or above the threshold, in row-major order.
+
+        A block of rows is correlated against the rows after it at a time,
+        so only block x N similarities are held in memory.
+        """
+        n_rows, n_cols = z.shape
+        z32 = z.astype(np.float32)
+        block_size = max(1, NEAR_DUPLICATE_BLOCK_ELEMENTS // max(n_rows, 1))
+        for start in range(0, n_rows, block_size):
+            stop = min(start + block_size, n_rows)
+            screen = (z32[start:stop] @ z32[start:].T) / n_cols
+            # Keep only pairs with i < j
+            screen[np.tril_indices(stop - start, m=n_rows - start)] = np.nan
+
+            rows, cols = np.nonzero(screen > 0.95 - FLOAT32_SCREEN_TOLERANCE)
+            yield rows + start, cols + start
+
+    @staticmethod
+    def _lsh_candidate_pairs(z: np.ndarray):
+        """
+        (rows, cols) chunks of i < j candidate pairs found by cosine LSH, or
+        None when the rows bucket too coarsely (few columns) to be worth it.
+
+        Rows are hashed by which side of random hyperplanes their z-scores
+        fall on; rows sharing all bits of any band become candidates. With
+        the default bands a pair at the 0.95 threshold is missed with
+        probability under 1%, more similar pairs less often. Pairs come out
+        in row-major order.
+        """
+        n_rows, n_cols = z.shape
+        valid = np.flatnonzero(np.isfinite(z).all(axis=1))
+        rng = np.random.default_rng(0)
+        hyperplanes = rng.standard_normal((n_cols, NEAR_DUPLICATE_LSH_BANDS * NEAR_DUPLICATE_LSH_BITS))
+        bits = (z[valid] @ hyperplanes) > 0
+        weights = 1 << np.arange(NEAR_DUPLICATE_LSH_BITS, dtype=np.int64)
+
+        pair_codes = []
+        n_candidates = 0
+        for band in range(NEAR_DUPLICATE_LSH_BANDS):
+            band_bits = bits[:, band * NEAR_DUPLICATE_LSH_BITS:(band + 1) * NEAR_DUPLICATE_LSH_BITS]
+            keys = band_bits @ weights
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            members = valid[order]
+            # Rows k places apart in key order share a bucket when their keys
+            # match; stepping k up to the largest bucket covers every pair
+            offset = 1
+            while offset < len(members):
+                same = np.flatnonzero(sorted_keys[offset:] == sorted_keys[:-offset])
+                if len(same) == 0:
+                    break
+                first, second = members[same], members[same + offset]
+                pair_codes.append(np.minimum(first, second) * n_rows + np.maximum(first, second))
+                n_candidates += len(same)
+                if n_candidates > NEAR_DUPLICATE_LSH_MAX_CANDIDATES:
+                    return None
+                offset += 1
+
+        if not pair_codes:
+            return []
+
+        # Deduplicate across bands; sorted codes are row-major pair order
+        codes = np.unique(np.concatenate(pair_codes))
+        return (
+            (chunk // n_rows, chunk % n_rows)
+            for chunk in np.array_split(codes, max(1, len(codes) // NEAR_DUPLICATE_BLOCK_ELEMENTS))
+        )
+
     def _assess_duplicate_severity(self, duplicate_pct: float) -> str:
         """Assess severity of duplicate data."""
         if duplicate_pct < 1:
@@ -204,16 +428,16 @@ class DataQualityAnalyzer:
     def _analyze_outliers(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Comprehensive outlier analysis using multiple methods."""
         outliers = {}
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols, values = self._numeric_data(df)
 
         if len(numeric_cols) == 0:
             return {"message": "No numeric columns found for outlier analysis"}
 
         # Statistical methods
-        outliers["statistical"] = self._statistical_outlier_detection(df, numeric_cols)
+        outliers["statistical"] = self._statistical_outlier_detection(df, numeric_cols, values)
 
         # ML-based methods
-        outliers["ml_based"] = self._ml_outlier_detection(df, numeric_cols)
+        outliers["ml_based"] = self._ml_outlier_detection(df, numeric_cols, values)
 
         # Combined analysis
         outliers["combined"] = self._combine_outlier_results(
@@ -223,35 +447,22 @@ class DataQualityAnalyzer:
         return outliers
 
     def _statistical_outlier_detection(self, df: pd.DataFrame,
-                                     numeric_cols: pd.Index) -> Dict[str, Any]:
+                                     numeric_cols: pd.Index,
+                                     values: np.ndarray) -> Dict[str, Any]:
         """Detect outliers using statistical methods."""
         results = {}
 
-        for col in numeric_cols:
-            col_data = df[col].dropna()
-            if len(col_data) == 0:
-                continue
-
-            # IQR method
-            Q1 = col_data.quantile(0.25)
-            Q3 = col_data.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+        # IQR, z-score and modified z-score masks for all columns in one pass
+        present_counts, bounds, iqr_mask, zscore_mask, modified_mask = statistical_outlier_masks(values)
 
-            iqr_outliers = col_data[
-                (col_data < lower_bound) | (col_data > upper_bound)
-            ]
-
-            # Z-score method
-            z_scores = np.abs(stats.zscore(col_data))
-            zscore_outliers = col_data[z_scores > 3]
+        for j, col in enumerate(numeric_cols):
+            if present_counts[j] == 0:
+                continue
 
-            # Modified Z-score method
-            median = col_data.median()
-            mad = np.median(np.abs(col_data - median))
-            modified_z_scores = 0.6745 * (col_data - median) / mad
-            modified_zscore_outliers = col_data[np.abs(modified_z_scores) > 3.5]
+            lower_bound, upper_bound = bounds[j]
+            iqr_outliers = df.index[iqr_mask[:, j]]
+            zscore_outliers = df.index[zscore_mask[:, j]]
+            modified_zscore_outliers = df.index[modified_mask[:, j]]
 
             results[col] = {
                 "iqr_outliers": len(iqr_outliers),
@@ -259,29 +470,47 @@ class DataQualityAnalyzer:
                 "modified_zscore_outliers": len(modified_zscore_outliers),
                 "iqr_bounds": [lower_bound, upper_bound],
                 "outlier_indices": {
-                    "iqr": iqr_outliers.index.tolist(),
-                    "zscore": zscore_outliers.index.tolist(),
-                    "modified_zscore": modified_zscore_outliers.index.tolist()
+                    "iqr": iqr_outliers.tolist(),
+                    "zscore": zscore_outliers.tolist(),
+                    "modified_zscore": modified_zscore_outliers.tolist()
                 }
             }
 
         return results
 
     def _ml_outlier_detection(self, df: pd.DataFrame,
-                             numeric_cols: pd.Index) -> Dict[str, Any]:
+                             numeric_cols: pd.Index,
+                             values: np.ndarray) -> Dict[str, Any]:
         """Detect outliers using machine learning methods."""
         results = {}
 
-        # Prepare data
-        numeric_df = df[numeric_cols].fillna(df[numeric_cols].median())
+        # Prepare data: missing values filled with the column median
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns stay NaN
+            medians = np.nanmedian(values, axis=0)
+        filled = np.where(np.isnan(values), medians, values)
+        numeric_df = pd.DataFrame(filled, index=df.index, columns=numeric_cols)
 
         if len(numeric_df) < 10:  # Need sufficient data
             return {"message": "Insufficient data for ML outlier detection"}
 
-        # Isolation Forest
+        # Large frames: fit on a sample and score every row against it, which
+        # keeps LOF's neighbour search from growing quadratically
+        if len(numeric_df) > ML_OUTLIER_SAMPLE_ROWS:
+            fit_df = numeric_df.sample(n=ML_OUTLIER_SAMPLE_ROWS, random_state=42)
+        else:
+            fit_df = None
+
+        # Isolation Forest; trees are built and scored across threads
+        # (results don't depend on n_jobs for a fixed random_state)
+        n_jobs = self.config.get("n_jobs", -1)
         try:
-            iso_forest = IsolationForest(contamination=0.1, random_state=42)
-            iso_predictions = iso_forest.fit_predict(numeric_df)
+            iso_forest = IsolationForest(contamination=0.1, random_state=42, n_jobs=n_jobs)
+            with parallel_backend("threading", n_jobs=n_jobs):
+                if fit_df is None:
+                    iso_predictions = iso_forest.fit_predict(numeric_df)
+                else:
+                    iso_predictions = self._predict_in_chunks(iso_forest.fit(fit_df), numeric_df)
             iso_outliers = numeric_df[iso_predictions == -1]
 
             results["isolation_forest"] = {
@@ -293,8 +522,12 @@ class DataQualityAnalyzer:
 
         # Local Outlier Factor
         try:
-            lof = LocalOutlierFactor(contamination=0.1)
-            lof_predictions = lof.fit_predict(numeric_df)
+            if fit_df is None:
+                lof = LocalOutlierFactor(contamination=0.1)
+                lof_predictions = lof.fit_predict(numeric_df)
+            else:
+                lof = LocalOutlierFactor(contamination=0.1, novelty=True, n_jobs=n_jobs)
+                lof_predictions = self._predict_in_chunks(lof.fit(fit_df), numeric_df)
             lof_outliers = numeric_df[lof_predictions == -1]
 
             results["local_outlier_factor"] = {
@@ -306,6 +539,14 @@ class DataQualityAnalyzer:
 
         return results
 
+    @staticmethod
+    def _predict_in_chunks(model, data: pd.DataFrame) -> np.ndarray:
+        """Inlier (1) / outlier (-1) labels for every row, ML_OUTLIER_CHUNK_ROWS at a time."""
+        return np.concatenate([
+            model.predict(data.iloc[start:start + ML_OUTLIER_CHUNK_ROWS])
+            for start in range(0, len(data), ML_OUTLIER_CHUNK_ROWS)
+        ])
+
     def _combine_outlier_results(self, statistical: Dict, ml_based: Dict) -> Dict[str, Any]:
         """Combine results from different outlier detection methods."""
         combined = {
@@ -341,8 +582,12 @@ class DataQualityAnalyzer:
             col_data = df[col]
             dtype = col_data.dtype
 
+            # Values that parse as numbers; shared by the mixed-type check and
+            # the dtype suggestion
+            numeric_count = self._count_numeric(col_data)
+
             # Check for mixed types
-            mixed_types = self._check_mixed_types(col_data)
+            mixed_types = self._check_mixed_types(col_data, numeric_count)
 
             # Check for format inconsistencies
             format_issues = self._check_format_inconsistencies(col_data)
@@ -351,17 +596,27 @@ class DataQualityAnalyzer:
                 "dtype": str(dtype),
                 "mixed_types": mixed_types,
                 "format_issues": format_issues,
-                "suggested_dtype": self._suggest_dtype(col_data)
+                "suggested_dtype": self._suggest_dtype(col_data, numeric_count)
             }
 
         return type_analysis
 
-    def _check_mixed_types(self, series: pd.Series) -> List[str]:
+    @staticmethod
+    def _count_numeric(series: pd.Series) -> int:
+        """Number of values that are, or parse as, numbers."""
+        if pd.api.types.is_numeric_dtype(series):
+            # Already numeric (or boolean): nothing to parse
+            return int(series.notna().sum())
+        return int(pd.to_numeric(series, errors='coerce').notna().sum())
+
+    def _check_mixed_types(self, series: pd.Series,
+                           numeric_count: Optional[int] = None) -> List[str]:
         """Check for mixed data types in a column."""
         issues = []
 
         # Check for mixed numeric and string
-        numeric_count = pd.to_numeric(series, errors='coerce').notna().sum()
+        if numeric_count is None:
+            numeric_count = self._count_numeric(series)
         string_count = len(series) - numeric_count
 
         if numeric_count > 0 and string_count > 0:
@@ -384,33 +639,46 @@ class DataQualityAnalyzer:
             if string_lengths.std() > string_lengths.mean() * 0.5:
                 issues.append("inconsistent_string_lengths")
 
-        # Check for currency format inconsistencies
-        currency_patterns = series.astype(str).str.contains(r'[\$€£¥]', na=False)
-        if currency_patterns.any() and not currency_patterns.all():
-            issues.append("inconsistent_currency_formats")
+        # Check for currency format inconsistencies; numbers, booleans and
+        # timestamps never render with a currency symbol, so only text is scanned
+        if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)):
+            currency_count = self._count_pattern_matches(series, CURRENCY_PATTERN)
+            if 0 < currency_count < len(series):
+                issues.append("inconsistent_currency_formats")
 
         return issues
 
+    @staticmethod
+    def _count_pattern_matches(series: pd.Series, pattern: str) -> int:
+        """Number of values whose string form contains a match for pattern (missing never match)."""
+        try:
+            values = pa.array(series, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed or non-string objects: match their str() like pandas would
+            values = pa.array(series.astype(str), type=pa.string())
+        return pc.sum(pc.match_substring_regex(values, pattern)).as_py() or 0
+
     def _detect_date_formats(self, series: pd.Series) -> List[str]:
         """Detect different date formats in a column."""
-        date_formats = set()
+        values = series.dropna().astype(object)
+        if pd.api.types.infer_dtype(values, skipna=True) != "string":
+            values = values[[isinstance(value, str) for value in values]]
 
-        for value in series.dropna():
-            if isinstance(value, str):
-                # Try to parse as date
-                try:
-                    pd.to_datetime(value)
-                    date_formats.add("detected")
-                except:
-                    pass
+        if len(values) == 0:
+            return []
 
-        return list(date_formats)
+        # Parse every string in one call; format='mixed' infers each
+        # element's format on its own, as parsing them one by one would
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed', utc=True)
+        return ["detected"] if parsed.notna().any() else []
 
-    def _suggest_dtype(self, series: pd.Series) -> str:
+    def _suggest_dtype(self, series: pd.Series,
+                       numeric_count: Optional[int] = None) -> str:
         """Suggest optimal data type for a column."""
         # Try to convert to numeric
-        numeric_series = pd.to_numeric(series, errors='coerce')
-        if numeric_series.notna().sum() / len(series) > 0.8:
+        if numeric_count is None:
+            numeric_count = self._count_numeric(series)
+        if len(series) and numeric_count / len(series) > 0.8:
             return "numeric"
 
         # Try to convert to datetime
@@ -430,7 +698,7 @@ class DataQualityAnalyzer:
     def _analyze_distributions(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze data distributions."""
         distributions = {}
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols, _ = self._numeric_data(df)
 
         for col in numeric_cols:
             col_data = df[col].dropna()
@@ -478,6 +746,9 @@ class DataQualityAnalyzer:
     def _test_normality(self, data: pd.Series) -> Dict[str, Any]:
         """Test for normality using multiple methods."""
         try:
+            if len(data) > NORMALITY_SAMPLE_SIZE:
+                data = data.sample(NORMALITY_SAMPLE_SIZE, random_state=0)
+
             # Shapiro-Wilk test
             shapiro_stat, shapiro_p = stats.shapiro(data)
 
@@ -501,43 +772,107 @@ class DataQualityAnalyzer:
 
     def _analyze_correlations(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze correlations between variables."""
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols, values = self._numeric_data(df)
 
         if len(numeric_cols) < 2:
             return {"message": "Insufficient numeric columns for correlation analysis"}
 
-        # Pearson correlation
-        pearson_corr = df[numeric_cols].corr()
+        if np.isnan(values).any():
+            # Pairwise-complete correlations need per-pair masking; Polars
+            # evaluates all pairs in parallel when it is installed
+            numeric_df = df[numeric_cols]
+            if POLARS_AVAILABLE:
+                pearson_corr = self._pairwise_correlation_frame(numeric_df, numeric_cols, 'pearson')
+                spearman_corr = self._pairwise_correlation_frame(numeric_df, numeric_cols, 'spearman')
+            else:
+                pearson_corr = numeric_df.corr()
+                spearman_corr = numeric_df.corr(method='spearman')
+        else:
+            # Complete data: one corrcoef over a single matrix per method
+            # (Spearman is Pearson on average ranks)
+            pearson_corr = self._correlation_frame(values, numeric_cols)
+            spearman_corr = self._correlation_frame(stats.rankdata(values, axis=0), numeric_cols)
 
-        # Spearman correlation
-        spearman_corr = df[numeric_cols].corr(method='spearman')
+        # Kept for the heatmap so it needn't be rebuilt from the payload
+        self._pearson_values = pearson_corr.to_numpy(dtype=np.float32)
 
         # Find high correlations
         high_correlations = self._find_high_correlations(pearson_corr)
 
         return {
-            "pearson_correlation": pearson_corr.to_dict(),
-            "spearman_correlation": spearman_corr.to_dict(),
+            "pearson_correlation": self._matrix_payload(pearson_corr),
+            "spearman_correlation": self._matrix_payload(spearman_corr),
             "high_correlations": high_correlations
         }
 
+    @staticmethod
+    def _matrix_payload(corr_matrix: pd.DataFrame) -> Dict[str, Any]:
+        """Square matrix as column labels plus row-major values (values[i][j])."""
+        return {
+            "columns": list(corr_matrix.columns),
+            "values": corr_matrix.to_numpy().tolist()
+        }
+
+    @staticmethod
+    def _correlation_frame(values: np.ndarray, columns) -> pd.DataFrame:
+        """Pearson correlation matrix of complete numeric data (rows x columns)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.corrcoef(values, rowvar=False)
+        return pd.DataFrame(np.atleast_2d(corr), index=columns, columns=columns)
+
+    @staticmethod
+    def _pairwise_correlation_frame(numeric_df: pd.DataFrame, columns, method: str) -> pd.DataFrame:
+        """Correlation matrix over pairwise-complete rows, computed with Polars."""
+        n_cols = len(columns)
+        names = [str(i) for i in range(n_cols)]
+        frame = pl.from_pandas(numeric_df.set_axis(names, axis=1))
+        pairs = [(i, j) for i in range(n_cols) for j in range(i, n_cols)]
+
+        # Spearman re-ranks each pair's complete rows, but a column without
+        # gaps ranks the same in every pair: rank those once and correlate
+        # the ranks directly when both sides of a pair are complete
+        ranked = set()
+        if method == 'spearman':
+            ranked = {i for i, nulls in enumerate(frame.null_count().row(0)) if nulls == 0}
+            frame = frame.with_columns([pl.col(names[i]).rank().alias(f"rank_{i}") for i in ranked])
+
+        def pair_correlation(i, j):
+            if i in ranked and j in ranked:
+                return pl.corr(f"rank_{i}", f"rank_{j}")
+            return pl.corr(names[i], names[j], method=method)
+
+        row = frame.select([
+            pair_correlation(i, j).alias(f"{i}_{j}")
+            for i, j in pairs
+        ]).row(0)
+
+        corr = np.empty((n_cols, n_cols))
+        for (i, j), value in zip(pairs, row):
+            corr[i, j] = corr[j, i] = np.nan if value is None else value
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
     def _find_high_correlations(self, corr_matrix: pd.DataFrame,
                                threshold: float = 0.8) -> List[Dict]:
         """Find highly correlated variable pairs."""
-        high_correlations = []
-
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i + 1, len(corr_matrix.columns)):
-                corr_value = corr_matrix.iloc[i, j]
-                if abs(corr_value) >= threshold:
-                    high_correlations.append({
-                        "variable1": corr_matrix.columns[i],
-                        "variable2": corr_matrix.columns[j],
-                        "correlation": corr_value,
-                        "type": "positive" if corr_value > 0 else "negative"
-                    })
-
-        return high_correlations
+        # Upper triangle only, so each pair is reported once
+        values = corr_matrix.to_numpy()
+        with np.errstate(invalid='ignore'):
+            mask = np.triu(np.abs(values) >= threshold, k=1)
+        columns = corr_matrix.columns
+
+        rows, cols = np.nonzero(mask)
+        corr_values = values[rows, cols]
+        corr_types = np.where(corr_values > 0, "positive", "negative")
+
+        return [
+            {
+                "variable1": columns[i],
+                "variable2": columns[j],
+                "correlation": corr_value,
+                "type": corr_type
+            }
+            for i, j, corr_value, corr_type in zip(rows, cols, corr_values.tolist(), corr_types.tolist())
+        ]
 
     def _calculate_quality_score(self) -> float:
         """Calculate overall data quality score."""
@@ -627,8 +962,33 @@ class DataQualityAnalyzer:
             if "pearson_correlation" in corr_data:
                 visualizations["correlation_heatmap"] = {
                     "type": "heatmap",
-                    "data": corr_data["pearson_correlation"],
+                    "data": self._heatmap_payload(corr_data["pearson_correlation"]),
                     "title": "Correlation Heatmap"
                 }
 
         return visualizations
+
+    def _heatmap_payload(self, matrix: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Heatmap data for a correlation payload.
+
+        Small matrices are passed through as nested lists. Wider ones are sent
+        as the raw little-endian float32 buffer, base64-encoded, which the
+        client reshapes to (n, n); NaN is kept as NaN.
+        """
+        columns = matrix["columns"]
+        if len(columns) <= HEATMAP_INLINE_MAX_COLUMNS:
+            return matrix
+
+        values = self._pearson_values
+        if values is None or values.shape[0] != len(columns):
+            # Results restored from storage only carry the nested lists
+            values = np.asarray(matrix["values"], dtype=np.float32)
+
+        return {
+            "columns": columns,
+            "shape": list(values.shape),
+            "dtype": "float32",
+            "encoding": "base64",
+            "values": base64.b64encode(values.astype('<f4').tobytes()).decode('ascii')
+        }
@@ -1,13 +1,45 @@
+import re
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional
-from sklearn.impute import SimpleImputer, KNNImputer
+from sklearn.impute import KNNImputer
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import cross_val_score
+import pyarrow as pa
+import pyarrow.compute as pc
 import warnings
 warnings.filterwarnings('ignore')
 
+from app.ml._kernels import NUMBA_AVAILABLE, clip_outliers, knn_impute
+
+# Non-null values parsed when guessing whether a column holds numbers, before the full parse
+NUMERIC_SAMPLE_ROWS = 1000
+# Non-null values parsed to rule out date columns before the full parse
+DATETIME_SAMPLE_ROWS = 1000
+# Rows sampled to find key-like columns for duplicate detection, and the
+# share of distinct sample values that marks a column as key-like
+KEY_SAMPLE_ROWS = 1000
+KEY_UNIQUE_RATIO = 0.9
+
+# Common abbreviations expanded in text columns, matched case-insensitively
+ABBREVIATIONS = {
+    'usa': 'United States',
+    'uk': 'United Kingdom',
+    'u.s.a.': 'United States',
+    'u.k.': 'United Kingdom'
+}
+ABBREVIATION_PATTERN = re.compile('|'.join(map(re.escape, ABBREVIATIONS)), re.IGNORECASE)
+# Runs of whitespace collapsed to a single space in text columns
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# RE2 equivalents for the Arrow string path: RE2's \s is ASCII-only, so the
+# other characters Python's \s matches are listed explicitly
+ARROW_WHITESPACE_PATTERN = r'[\s\x{0b}\x{1c}-\x{1f}\x{85}\p{Z}]+'
+ARROW_ABBREVIATION_PATTERNS = {
+    '(?i)' + re.escape(abbreviation): expansion
+    for abbreviation, expansion in ABBREVIATIONS.items()
+}
+
 
 class AutoDataCleaner:
     """
@@ -20,6 +52,7 @@ class AutoDataCleaner:
         self.imputers = {}
         self.encoders = {}
         self.scalers = {}
+        self._column_kinds = pd.Series(dtype=object)
 
     def clean_dataset(self, df: pd.DataFrame,
                      analysis_results: Optional[Dict] = None) -> pd.DataFrame:
@@ -34,26 +67,37 @@ class AutoDataCleaner:
             "transformation_summary": {}
         }
 
-        # Create a copy to avoid modifying original
-        cleaned_df = df.copy()
+        # Copy-on-Write, for this pipeline only, lets it start from a shallow
+        # copy: the input's data is copied only for columns that get written to
+        with pd.option_context("mode.copy_on_write", True):
+            cleaned_df = df.copy(deep=False)
+
+            # Classify columns once; steps that change dtypes update the affected columns
+            self._column_kinds = self._classify_columns(cleaned_df.dtypes)
 
-        # Step 1: Handle missing data
-        cleaned_df = self._handle_missing_data(cleaned_df, analysis_results)
+            # Step 1: Handle missing data
+            cleaned_df = self._handle_missing_data(cleaned_df, analysis_results)
 
-        # Step 2: Handle outliers
-        cleaned_df = self._handle_outliers(cleaned_df, analysis_results)
+            # Step 2: Handle outliers
+            cleaned_df = self._handle_outliers(
+                cleaned_df, analysis_results, self._columns_of_kind("numeric")
+            )
 
-        # Step 3: Remove duplicates
-        cleaned_df = self._remove_duplicates(cleaned_df)
+            # Step 3: Remove duplicates
+            cleaned_df = self._remove_duplicates(cleaned_df)
 
-        # Step 4: Standardize data types
-        cleaned_df = self._standardize_data_types(cleaned_df)
+            # Step 4: Standardize data types
+            cleaned_df = self._standardize_data_types(cleaned_df)
+            # Narrow numeric dtypes so scaling streams half the bytes
+            cleaned_df = self._downcast_numerics(cleaned_df, self._columns_of_kind("numeric"))
 
-        # Step 5: Handle inconsistencies
-        cleaned_df = self._handle_inconsistencies(cleaned_df)
+            # Step 5: Handle inconsistencies
+            cleaned_df = self._handle_inconsistencies(cleaned_df)
 
-        # Step 6: Feature scaling and encoding
-        cleaned_df = self._apply_transformations(cleaned_df)
+            # Step 6: Feature scaling and encoding
+            cleaned_df = self._apply_transformations(
+                cleaned_df, self._columns_of_kind("numeric"), self._columns_of_kind("categorical")
+            )
 
         self.cleaning_results["final_shape"] = cleaned_df.shape
         self.cleaning_results["rows_removed"] = (
@@ -63,14 +107,39 @@ class AutoDataCleaner:
 
         return cleaned_df
 
+    def _classify_columns(self, dtypes: pd.Series) -> pd.Series:
+        """Label each column as numeric, categorical or other from its dtype."""
+        # Same split as select_dtypes(include=[np.number]): no bools, timedeltas included
+        numeric = (
+            dtypes.map(pd.api.types.is_numeric_dtype) & ~dtypes.map(pd.api.types.is_bool_dtype)
+        ) | dtypes.map(pd.api.types.is_timedelta64_dtype)
+        categorical = (dtypes == object) | dtypes.map(lambda dtype: isinstance(dtype, pd.CategoricalDtype))
+        return pd.Series(
+            np.select([numeric, categorical], ["numeric", "categorical"], "other"),
+            index=dtypes.index
+        )
+
+    def _update_column_kinds(self, df: pd.DataFrame, cols: List[str]):
+        """Reclassify columns whose dtype may have changed and forget dropped ones."""
+        kinds = self._column_kinds.reindex(df.columns)
+        changed = df.columns.intersection(cols)
+        kinds[changed] = self._classify_columns(df.dtypes[changed])
+        self._column_kinds = kinds
+
+    def _columns_of_kind(self, kind: str) -> List[str]:
+        """Columns of the given kind, in frame order."""
+        return self._column_kinds.index[self._column_kinds == kind].tolist()
+
     def _handle_missing_data(self, df: pd.DataFrame,
                            analysis_results: Optional[Dict]) -> pd.DataFrame:
         """Intelligent missing data handling."""
+        null_counts = self._null_counts(df)
+
         if analysis_results and "missing_data" in analysis_results:
             missing_data = analysis_results["missing_data"]
         else:
             # Analyze missing data if not provided
-            missing_data = self._analyze_missing_data(df)
+            missing_data = self._analyze_missing_data(df, null_counts)
 
         self.cleaning_results["imputation_summary"] = {
             "columns_imputed": [],
@@ -78,37 +147,49 @@ class AutoDataCleaner:
             "imputation_stats": {}
         }
 
-        for col in df.columns:
-            missing_count = df[col].isnull().sum()
-            if missing_count > 0:
-                imputation_method = self._select_imputation_method(
-                    df, col, missing_count, missing_data
-                )
+        # Group columns by method so each strategy runs once over its block
+        methods = {}
+        for col, missing_count in null_counts[null_counts > 0].items():
+            imputation_method = self._select_imputation_method(
+                df, col, missing_count, missing_data
+            )
+            methods.setdefault(imputation_method, []).append(col)
 
-                df[col] = self._apply_imputation(df, col, imputation_method)
+            self.cleaning_results["imputation_summary"]["columns_imputed"].append(col)
+            self.cleaning_results["imputation_summary"]["methods_used"][col] = imputation_method
 
-                self.cleaning_results["imputation_summary"]["columns_imputed"].append(col)
-                self.cleaning_results["imputation_summary"]["methods_used"][col] = imputation_method
+            self.cleaning_results["cleaning_steps"].append(
+                f"Imputed {missing_count} missing values in '{col}' using {imputation_method}"
+            )
 
-                self.cleaning_results["cleaning_steps"].append(
-                    f"Imputed {missing_count} missing values in '{col}' using {imputation_method}"
-                )
+        # KNN runs last so its neighbours are found on already-imputed features
+        for method in sorted(methods, key=lambda m: m == "knn"):
+            df = self._apply_imputation(df, methods[method], method)
+            self._update_column_kinds(df, methods[method])
 
         return df
 
-    def _analyze_missing_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _null_counts(self, df: pd.DataFrame) -> pd.Series:
+        """Missing values per column."""
+        # Counted column by column without building a frame-sized mask;
+        # Arrow-backed columns answer from their validity bitmap
+        return len(df) - df.count()
+
+    def _analyze_missing_data(self, df: pd.DataFrame,
+                              column_missing: Optional[pd.Series] = None) -> Dict[str, Any]:
         """Analyze missing data patterns."""
         missing_data = {}
 
+        # Per column missing data
+        if column_missing is None:
+            column_missing = self._null_counts(df)
+        column_missing_pct = (column_missing / len(df)) * 100
+
         # Overall missing data
-        total_missing = df.isnull().sum().sum()
+        total_missing = column_missing.sum()
         total_cells = df.size
         missing_percentage = (total_missing / total_cells) * 100
 
-        # Per column missing data
-        column_missing = df.isnull().sum()
-        column_missing_pct = (column_missing / len(df)) * 100
-
         missing_data = {
             "total_missing": total_missing,
             "total_cells": total_cells,
@@ -146,67 +227,73 @@ class AutoDataCleaner:
             else:
                 return "constant"
 
-    def _apply_imputation(self, df: pd.DataFrame, col: str, method: str) -> pd.Series:
-        """Apply the selected imputation method."""
+    def _apply_imputation(self, df: pd.DataFrame, cols: List[str], method: str) -> pd.DataFrame:
+        """Apply the selected imputation method to a block of columns."""
         if method == "drop_column":
-            df.drop(columns=[col], inplace=True)
-            return df[col] if col in df.columns else pd.Series()
-
-        elif method == "mean":
-            imputer = SimpleImputer(strategy='mean')
-            imputed_values = imputer.fit_transform(df[[col]]).flatten()
-            self.imputers[col] = imputer
-            return imputed_values
-
-        elif method == "median":
-            imputer = SimpleImputer(strategy='median')
-            imputed_values = imputer.fit_transform(df[[col]]).flatten()
-            self.imputers[col] = imputer
-            return imputed_values
-
-        elif method == "mode":
-            imputer = SimpleImputer(strategy='most_frequent')
-            imputed_values = imputer.fit_transform(df[[col]]).flatten()
-            self.imputers[col] = imputer
-            return imputed_values
+            return df.drop(columns=cols)
+
+        elif method in ("mean", "median", "mode"):
+            block = df[cols]
+            if method == "mean":
+                fills = block.mean()
+            elif method == "median":
+                fills = block.median()
+            else:
+                # Sorted modes: ties go to the smallest value, as with SimpleImputer
+                fills = block.mode().iloc[0]
+            df[cols] = block.fillna(fills)
+            self.imputers.update({col: (method, fills[col]) for col in cols})
+            return df
 
         elif method == "knn":
             # Use KNN imputation for numeric columns
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-            if col in numeric_cols and len(numeric_cols) > 1:
-                # Remove the target column from features
-                feature_cols = [c for c in numeric_cols if c != col]
-                if feature_cols:
-                    imputer = KNNImputer(n_neighbors=min(5, len(df)))
-                    temp_df = df[feature_cols + [col]].copy()
-                    temp_df = pd.DataFrame(
-                        imputer.fit_transform(temp_df),
-                        columns=temp_df.columns,
-                        index=temp_df.index
+            numeric_cols = self._columns_of_kind("numeric")
+            # Numeric-like columns outside the block (e.g. nullable booleans)
+            # aren't features of the imputer and fall back to the median
+            numeric_set = set(numeric_cols)
+            knn_cols = [col for col in cols if col in numeric_set]
+            if knn_cols and len(numeric_cols) > 1:
+                # One imputer over the numeric block fills every KNN column at once;
+                # only those columns are written back so other numeric dtypes survive
+                imputer = KNNImputer(n_neighbors=min(5, len(df)), keep_empty_features=True)
+                targets = pd.Index(numeric_cols).get_indexer(knn_cols)
+                if NUMBA_AVAILABLE:
+                    # Same neighbours as the imputer, searched in parallel per row
+                    values = np.ascontiguousarray(
+                        df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
                     )
-                    df[col] = temp_df[col]
-                    self.imputers[col] = imputer
-                    return df[col]
+                    imputer.fit(df[numeric_cols])
+                    df[knn_cols] = knn_impute(values, targets, imputer.n_neighbors)
+                else:
+                    df[knn_cols] = imputer.fit_transform(df[numeric_cols])[:, targets]
+                self.imputers.update({col: (method, imputer) for col in knn_cols})
+
+                other_cols = [col for col in cols if col not in numeric_set]
+                if other_cols:
+                    df = self._apply_imputation(df, other_cols, "median")
+                return df
 
             # Fallback to median if KNN fails
-            imputer = SimpleImputer(strategy='median')
-            imputed_values = imputer.fit_transform(df[[col]]).flatten()
-            self.imputers[col] = imputer
-            return imputed_values
+            return self._apply_imputation(df, cols, "median")
 
         elif method == "constant":
             # Use a placeholder value
-            placeholder = "Unknown" if df[col].dtype == 'object' else -999
-            df[col] = df[col].fillna(placeholder)
-            return df[col]
+            placeholders = {
+                col: "Unknown" if df[col].dtype == 'object' else -999
+                for col in cols
+            }
+            df[cols] = df[cols].fillna(placeholders)
+            self.imputers.update({col: (method, value) for col, value in placeholders.items()})
+            return df
 
         else:
             # Default to forward fill
-            df[col] = df[col].fillna(method='ffill').fillna(method='bfill')
-            return df[col]
+            df[cols] = df[cols].ffill().bfill()
+            return df
 
     def _handle_outliers(self, df: pd.DataFrame,
-                        analysis_results: Optional[Dict]) -> pd.DataFrame:
+                        analysis_results: Optional[Dict],
+                        numeric_cols: List[str]) -> pd.DataFrame:
         """Handle outliers based on analysis results."""
         if not analysis_results or "outliers" not in analysis_results:
             return df
@@ -231,43 +318,67 @@ class AutoDataCleaner:
                     f"Removed {len(outlier_indices)} outlier rows"
                 )
 
-        # Handle outliers by column using IQR method
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        # Cap outliers by column using IQR method, all numeric columns at once
+        if not numeric_cols:
+            return df
 
-        for col in numeric_cols:
-            col_data = df[col].dropna()
-            if len(col_data) == 0:
-                continue
-
-            Q1 = col_data.quantile(0.25)
-            Q3 = col_data.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-
-            # Cap outliers instead of removing
-            outliers_mask = (df[col] < lower_bound) | (df[col] > upper_bound)
-            outliers_count = outliers_mask.sum()
-
-            if outliers_count > 0:
-                df.loc[outliers_mask, col] = df.loc[outliers_mask, col].clip(
-                    lower=lower_bound, upper=upper_bound
-                )
+        quartiles = df[numeric_cols].quantile([0.25, 0.75])
+        Q1 = quartiles.loc[0.25].to_numpy(dtype=float)
+        Q3 = quartiles.loc[0.75].to_numpy(dtype=float)
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+
+        # Cap outliers instead of removing; NaN bounds (all-missing columns) match nothing.
+        # Clipped in a copy: a single-block frame hands out a view of its own data
+        # (read-only under Copy-on-Write)
+        values = np.array(
+            df[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan), order="F", copy=True
+        )
+        if NUMBA_AVAILABLE:
+            # Clip and count in one parallel pass per column
+            outliers_counts = clip_outliers(values, lower_bound, upper_bound)
+        else:
+            outliers_mask = (values < lower_bound) | (values > upper_bound)
+            np.clip(values, lower_bound, upper_bound, out=values, where=outliers_mask)
+            outliers_counts = outliers_mask.sum(axis=0)
 
-                self.cleaning_results["outlier_treatment"]["columns_processed"].append(col)
-                self.cleaning_results["outlier_treatment"]["outliers_capped"] += outliers_count
-                self.cleaning_results["outlier_treatment"]["methods_used"][col] = "iqr_capping"
+        capped = outliers_counts > 0
+        capped_cols = [col for col, is_capped in zip(numeric_cols, capped) if is_capped]
+        if capped_cols:
+            df[capped_cols] = values[:, capped]
 
-                self.cleaning_results["cleaning_steps"].append(
-                    f"Capped {outliers_count} outliers in '{col}' using IQR method"
-                )
+        for col, outliers_count in zip(capped_cols, outliers_counts[capped]):
+            self.cleaning_results["outlier_treatment"]["columns_processed"].append(col)
+            self.cleaning_results["outlier_treatment"]["outliers_capped"] += outliers_count
+            self.cleaning_results["outlier_treatment"]["methods_used"][col] = "iqr_capping"
+
+            self.cleaning_results["cleaning_steps"].append(
+                f"Capped {outliers_count} outliers in '{col}' using IQR method"
+            )
 
         return df
 
     def _remove_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
         """Remove duplicate rows."""
         original_count = len(df)
-        df = df.drop_duplicates()
+
+        subset = self.config.get("dedup_subset")
+        if subset:
+            # Caller-provided key: rows sharing it are duplicates
+            df = df.drop_duplicates(subset=subset, keep='first')
+        else:
+            key_cols = self._likely_key_columns(df)
+            if key_cols:
+                # Rows unique on key-like columns are unique overall, so only
+                # rows sharing a key are compared in full
+                candidates = df.duplicated(subset=key_cols, keep=False).to_numpy()
+                duplicated = np.zeros(len(df), dtype=bool)
+                duplicated[candidates] = df[candidates].duplicated().to_numpy()
+                df = df[~duplicated]
+            else:
+                df = df.drop_duplicates()
+
         removed_count = original_count - len(df)
 
         if removed_count > 0:
@@ -277,9 +388,18 @@ class AutoDataCleaner:
 
         return df
 
+    def _likely_key_columns(self, df: pd.DataFrame) -> List[str]:
+        """Columns whose sampled values are nearly all distinct."""
+        sample = df.head(KEY_SAMPLE_ROWS)
+        if sample.empty:
+            return []
+        unique_ratio = sample.nunique() / len(sample)
+        return unique_ratio.index[unique_ratio > KEY_UNIQUE_RATIO].tolist()
+
     def _standardize_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Standardize data types across columns."""
         self.cleaning_results["transformation_summary"]["type_conversions"] = {}
+        converted_cols = []
 
         for col in df.columns:
             original_dtype = str(df[col].dtype)
@@ -295,6 +415,7 @@ class AutoDataCleaner:
                         df[col] = pd.to_numeric(df[col], errors='coerce')
                     elif new_dtype == "categorical":
                         df[col] = df[col].astype('category')
+                    converted_cols.append(col)
 
                     self.cleaning_results["transformation_summary"]["type_conversions"][col] = {
                         "from": original_dtype,
@@ -308,6 +429,18 @@ class AutoDataCleaner:
                     # Keep original type if conversion fails
                     pass
 
+        self._update_column_kinds(df, converted_cols)
+
+        return df
+
+    def _downcast_numerics(self, df: pd.DataFrame, numeric_cols: List[str]) -> pd.DataFrame:
+        """Shrink numeric columns to the smallest dtype that holds their values."""
+        for col in numeric_cols:
+            if pd.api.types.is_float_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast='float')
+            elif pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+
         return df
 
     def _suggest_optimal_dtype(self, series: pd.Series) -> str:
@@ -316,15 +449,21 @@ class AutoDataCleaner:
         if pd.api.types.is_datetime64_any_dtype(series):
             return "datetime"
 
-        # Try to convert to numeric
-        numeric_series = pd.to_numeric(series, errors='coerce')
-        if numeric_series.notna().sum() / len(series) > 0.8:
-            return "numeric"
+        # Try to convert to numeric, parsing the whole column only if a sample
+        # of its values passes (nulls left out, so sparse columns aren't rejected)
+        sample = series.dropna().head(NUMERIC_SAMPLE_ROWS)
+        if pd.to_numeric(sample, errors='coerce').notna().mean() > 0.8:
+            numeric_series = pd.to_numeric(series, errors='coerce')
+            if numeric_series.notna().sum() / len(series) > 0.8:
+                return "numeric"
 
-        # Try to convert to datetime
+        # Try to convert to datetime: a sample rejects most non-date columns
+        # cheaply, the whole column must then parse without losing values
         try:
-            pd.to_datetime(series)
-            return "datetime"
+            values = series.dropna()
+            if pd.to_datetime(values.head(DATETIME_SAMPLE_ROWS), errors='coerce').notna().all():
+                if pd.to_datetime(values, errors='coerce').notna().all():
+                    return "datetime"
         except:
             pass
 
@@ -341,50 +480,67 @@ class AutoDataCleaner:
 
         for col in df.columns:
             if df[col].dtype == 'object':
-                # Handle string inconsistencies
-                df[col] = self._standardize_strings(df[col])
-
-                # Handle case inconsistencies
-                df[col] = self._standardize_case(df[col])
+                df[col] = self._standardize_text(df[col])
 
         return df
 
+    def _standardize_text(self, series: pd.Series) -> pd.Series:
+        """Standardize strings and case in one Arrow pass, or with pandas for mixed columns."""
+        try:
+            values = pa.array(series, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Non-string values, which the pandas string methods turn into NaN
+            return self._standardize_case(self._standardize_strings(series))
+
+        values = pc.utf8_trim_whitespace(values)
+        values = pc.replace_substring_regex(values, pattern=ARROW_WHITESPACE_PATTERN, replacement=' ')
+        # The abbreviations cannot overlap, so one pass each matches the combined pattern
+        for pattern, expansion in ARROW_ABBREVIATION_PATTERNS.items():
+            values = pc.replace_substring_regex(values, pattern=pattern, replacement=expansion)
+        values = pc.utf8_title(values) if self._is_title_column(series) else pc.utf8_capitalize(values)
+
+        # Keep the column's own missing-value markers
+        result = values.to_numpy(zero_copy_only=False)
+        missing = series.isna().to_numpy()
+        result[missing] = series.to_numpy()[missing]
+        return pd.Series(result, index=series.index, name=series.name, dtype=object)
+
     def _standardize_strings(self, series: pd.Series) -> pd.Series:
         """Standardize string values."""
         # Remove extra whitespace
         series = series.str.strip()
 
         # Replace multiple spaces with single space
-        series = series.str.replace(r'\s+', ' ', regex=True)
-
-        # Handle common abbreviations
-        abbreviations = {
-            'usa': 'United States',
-            'uk': 'United Kingdom',
-            'u.s.a.': 'United States',
-            'u.k.': 'United Kingdom'
-        }
+        series = series.str.replace(WHITESPACE_PATTERN, ' ', regex=True)
 
-        for abbr, full in abbreviations.items():
-            series = series.str.replace(abbr, full, case=False, regex=False)
+        # Handle common abbreviations in a single pass
+        series = series.str.replace(
+            ABBREVIATION_PATTERN, lambda match: ABBREVIATIONS[match.group(0).lower()], regex=True
+        )
 
         return series
 
     def _standardize_case(self, series: pd.Series) -> pd.Series:
         """Standardize case in string columns."""
         # Use title case for names, sentence case for descriptions
-        if series.name and any(word in series.name.lower() for word in ['name', 'title', 'category']):
+        if self._is_title_column(series):
             return series.str.title()
         else:
             return series.str.capitalize()
 
-    def _apply_transformations(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _is_title_column(self, series: pd.Series) -> bool:
+        """Whether a text column holds names or titles rather than descriptions."""
+        return bool(series.name) and any(
+            word in series.name.lower() for word in ['name', 'title', 'category']
+        )
+
+    def _apply_transformations(self, df: pd.DataFrame, numeric_cols: List[str],
+                               categorical_cols: List[str]) -> pd.DataFrame:
         """Apply feature scaling and encoding."""
         self.cleaning_results["transformation_summary"]["scaling"] = {}
         self.cleaning_results["transformation_summary"]["encoding"] = {}
 
         # Scale numeric features
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
         if len(numeric_cols) > 0:
             scaler = StandardScaler()
             df[numeric_cols] = scaler.fit_transform(df[numeric_cols])
@@ -396,12 +552,13 @@ class AutoDataCleaner:
             )
 
         # Encode categorical features
-        categorical_cols = df.select_dtypes(include=['category', 'object']).columns
         for col in categorical_cols:
             if df[col].nunique() < 50:  # Only encode if not too many unique values
-                encoder = LabelEncoder()
-                df[col] = encoder.fit_transform(df[col].astype(str))
-                self.encoders[col] = encoder
+                # Sorted string categories give the same codes LabelEncoder would,
+                # missing values included as 'nan'
+                labels = df[col].astype(str).astype('category')
+                df[col] = labels.cat.codes
+                self.encoders[col] = dict(enumerate(labels.cat.categories))
 
                 self.cleaning_results["transformation_summary"]["encoding"][col] = "label_encoding"
                 self.cleaning_results["cleaning_steps"].append(
@@ -13,6 +13,8 @@ class Dataset(Base):
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer, nullable=False)
     file_type = Column(String(50), nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)  # BLAKE2b of file bytes
+    parquet_path = Column(String(500), nullable=True)  # Parquet copy used for previews
 
     # Dataset metadata
     row_count = Column(Integer, nullable=True)
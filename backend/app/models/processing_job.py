@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -35,5 +35,10 @@ class ProcessingJob(Base):
     # Relationships
     dataset = relationship("Dataset", back_populates="processing_jobs")
 
+    # Serves "latest job of a type/status for a dataset" lookups as an index range scan
+    __table_args__ = (
+        Index("ix_jobs_ds_type_status_created", dataset_id, job_type, status, created_at.desc()),
+    )
+
     def __repr__(self):
         return f"<ProcessingJob(id={self.id}, type='{self.job_type}')>"
@@ -1,48 +1,104 @@
 import pandas as pd
 import numpy as np
 import json
-from sqlalchemy.orm import Session
+from collections import OrderedDict
 from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, Optional
 
+from app.core.database import SessionLocal
+from app.core.responses import to_jsonable
 from app.models.dataset import Dataset
 from app.models.processing_job import ProcessingJob
 from app.services.dataset_service import DatasetService
 from app.ml.data_analyzer import DataQualityAnalyzer
 
+# Serialized analysis results keyed by file content hash (LRU)
+ANALYSIS_CACHE_SIZE = 256
+_analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Fixed suggestion lists for detailed recommendations
+MISSING_DATA_SUGGESTIONS = [
+    "Use mean/median imputation for numeric columns",
+    "Use mode imputation for categorical columns",
+    "Consider KNN imputation for complex patterns"
+]
+DUPLICATE_SUGGESTIONS = [
+    "Remove exact duplicate rows",
+    "Review near-duplicate rows",
+    "Implement data validation rules"
+]
+OUTLIER_SUGGESTIONS = [
+    "Review outliers for data entry errors",
+    "Consider capping outliers using IQR method",
+    "Use robust statistical methods"
+]
+DATA_TYPE_SUGGESTIONS = [
+    "Standardize data format",
+    "Convert to appropriate data type",
+    "Handle mixed numeric/string values"
+]
+
+# Cap on per-column data type recommendations for very wide datasets
+MAX_DATA_TYPE_RECOMMENDATIONS = 50
+
 
 class AnalysisService:
     """Service for running data quality analysis."""
 
     @staticmethod
-    def _make_json_serializable(obj):
-        """Convert numpy types to Python native types for JSON serialization."""
-        if isinstance(obj, dict):
-            return {key: AnalysisService._make_json_serializable(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [AnalysisService._make_json_serializable(item) for item in obj]
-        elif isinstance(obj, tuple):
-            return tuple(AnalysisService._make_json_serializable(item) for item in obj)
-        elif isinstance(obj, (np.integer, np.int64, np.int32)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, (np.dtype, pd.core.dtypes.base.ExtensionDtype)):
-            return str(obj)
-        elif pd.isna(obj):
-            return None
-        elif hasattr(obj, 'dtype'):  # Catch any pandas/numpy objects with dtype
-            if hasattr(obj, 'item'):  # Single values
-                return obj.item()
-            else:
-                return str(obj)
-        else:
-            return obj
+    def build_recommendations(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build detailed improvement recommendations from analysis results."""
+        recommendations = []
+
+        # Missing data recommendations
+        missing_pct = results.get("missing_data", {}).get("missing_percentage", 0)
+        if missing_pct > 5:
+            recommendations.append({
+                "type": "missing_data",
+                "severity": "high" if missing_pct > 20 else "medium",
+                "message": f"High missing data ({missing_pct:.1f}%). Consider imputation strategies.",
+                "suggestions": MISSING_DATA_SUGGESTIONS
+            })
+
+        # Duplicate recommendations
+        duplicate_pct = results.get("duplicates", {}).get("exact_duplicate_pct", 0)
+        if duplicate_pct > 1:
+            recommendations.append({
+                "type": "duplicates",
+                "severity": "high" if duplicate_pct > 10 else "medium",
+                "message": f"Duplicate data detected ({duplicate_pct:.1f}%).",
+                "suggestions": DUPLICATE_SUGGESTIONS
+            })
+
+        # Outlier recommendations
+        total_outliers = results.get("outliers", {}).get("combined", {}).get("total_outliers", 0)
+        if total_outliers > 0:
+            recommendations.append({
+                "type": "outliers",
+                "severity": "medium",
+                "message": f"Outliers detected ({total_outliers} points).",
+                "suggestions": OUTLIER_SUGGESTIONS
+            })
+
+        # Data type recommendations
+        mixed_type_columns = islice(
+            (col for col, analysis in results.get("data_types", {}).items() if analysis.get("mixed_types")),
+            MAX_DATA_TYPE_RECOMMENDATIONS
+        )
+        recommendations.extend({
+            "type": "data_types",
+            "severity": "medium",
+            "message": f"Column '{col}' has mixed data types.",
+            "suggestions": DATA_TYPE_SUGGESTIONS
+        } for col in mixed_type_columns)
+
+        return recommendations
 
     @staticmethod
-    def run_analysis(dataset_id: int, job_id: int, db: Session):
+    def run_analysis(dataset_id: int, job_id: int):
         """Run analysis in background."""
+        db = SessionLocal()
         try:
             # Update job status
             job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
@@ -61,7 +117,10 @@ class AnalysisService:
             results = analyzer.analyze_dataset(df)
 
             # Convert results to JSON-serializable format
-            serializable_results = AnalysisService._make_json_serializable(results)
+            serializable_results = to_jsonable(results)
+            serializable_results["detailed_recommendations"] = AnalysisService.build_recommendations(
+                serializable_results
+            )
 
             # Update job with results
             job.status = "completed"
@@ -91,15 +150,52 @@ class AnalysisService:
                     db.commit()
             except Exception:
                 db.rollback()
+        finally:
+            db.close()
 
     @staticmethod
-    def analyze_dataset_sync(file_path: str):
-        """Run analysis synchronously."""
-        # Read dataset
-        df = DatasetService.read_file(file_path)
+    def analyze_dataset_sync(file_path: str, content_hash: Optional[str] = None,
+                             sections: Optional[List[str]] = None,
+                             column_dtypes: Optional[Dict[str, str]] = None):
+        """
+        Run analysis synchronously, reusing results for identical file content.
+
+        sections is passed to DataQualityAnalyzer.analyze_dataset to compute
+        only part of the report; a cached full report also serves those.
+        Given the dataset's column dtypes, only the columns those sections
+        use are read.
+        """
+        cache_key = content_hash
+        if content_hash and sections is not None:
+            if content_hash in _analysis_cache:
+                _analysis_cache.move_to_end(content_hash)
+                return _analysis_cache[content_hash]
+            cache_key = f"{content_hash}:{','.join(sorted(sections))}"
+
+        if cache_key and cache_key in _analysis_cache:
+            _analysis_cache.move_to_end(cache_key)
+            return _analysis_cache[cache_key]
+
+        # Read dataset, only the columns the requested sections use
+        columns = None
+        if column_dtypes:
+            columns = DataQualityAnalyzer.columns_needed(column_dtypes, sections)
+        try:
+            df = DatasetService.read_file(file_path, columns=columns)
+        except (ValueError, KeyError):
+            if columns is None:
+                raise
+            # Recorded dtypes naming columns the file doesn't have as such
+            # (e.g. non-string Excel headers); read everything instead
+            df = DatasetService.read_file(file_path)
 
         # Run analysis
         analyzer = DataQualityAnalyzer()
-        results = analyzer.analyze_dataset(df)
+        results = to_jsonable(analyzer.analyze_dataset(df, sections))
+
+        if cache_key:
+            _analysis_cache[cache_key] = results
+            if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                _analysis_cache.popitem(last=False)
 
         return results
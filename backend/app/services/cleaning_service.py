@@ -1,49 +1,47 @@
 import pandas as pd
 import numpy as np
 import os
-from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Any, Dict, Optional
 
+from app.core.database import SessionLocal
+from app.core.responses import to_jsonable
 from app.models.dataset import Dataset
 from app.models.processing_job import ProcessingJob
 from app.services.dataset_service import DatasetService
 from app.ml.data_cleaner import AutoDataCleaner
 from app.ml.data_analyzer import DataQualityAnalyzer
 
+# Analysis sections the cleaner reads from analysis results
+CLEANING_ANALYSIS_SECTIONS = ["missing_data", "outliers"]
+
 
 class CleaningService:
     """Service for running data cleaning operations."""
 
     @staticmethod
-    def _make_json_serializable(obj):
-        """Convert numpy types to Python native types for JSON serialization."""
-        if isinstance(obj, dict):
-            return {key: CleaningService._make_json_serializable(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [CleaningService._make_json_serializable(item) for item in obj]
-        elif isinstance(obj, tuple):
-            return tuple(CleaningService._make_json_serializable(item) for item in obj)
-        elif isinstance(obj, (np.integer, np.int64, np.int32)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, (np.dtype, pd.core.dtypes.base.ExtensionDtype)):
-            return str(obj)
-        elif pd.isna(obj):
+    def _load_analysis_results(db, dataset_id: int, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Results of the dataset's latest completed analysis, if they describe this frame."""
+        prior = db.query(ProcessingJob).filter(
+            ProcessingJob.dataset_id == dataset_id,
+            ProcessingJob.job_type == "analyze",
+            ProcessingJob.status == "completed"
+        ).order_by(ProcessingJob.completed_at.desc()).first()
+
+        results = prior.results if prior else None
+        if not results or any(section not in results for section in CLEANING_ANALYSIS_SECTIONS):
+            return None
+
+        # Stored JSON keys are strings; only reuse them if they name the frame's columns
+        if list(results["missing_data"].get("column_missing_pct", {})) != list(df.columns):
             return None
-        elif hasattr(obj, 'dtype'):  # Catch any pandas/numpy objects with dtype
-            if hasattr(obj, 'item'):  # Single values
-                return obj.item()
-            else:
-                return str(obj)
-        else:
-            return obj
+
+        return results
 
     @staticmethod
-    def run_cleaning(dataset_id: int, job_id: int, db: Session):
+    def run_cleaning(dataset_id: int, job_id: int):
         """Run cleaning in background."""
+        db = SessionLocal()
         try:
             # Update job status
             job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
@@ -58,12 +56,14 @@ class CleaningService:
             if dataset.status not in ["analyzed", "cleaned"]:
                 raise ValueError("Dataset must be analyzed before cleaning. Please run analysis first.")
 
-            # Read dataset
-            df = DatasetService.read_file(dataset.file_path)
+            # Read dataset from its Parquet copy when there is one
+            df = DatasetService.read_dataset(dataset)
 
-            # Run analysis first to get context
-            analyzer = DataQualityAnalyzer()
-            analysis_results = analyzer.analyze_dataset(df)
+            # Reuse the earlier analysis for context, analyzing only if it is unusable
+            analysis_results = CleaningService._load_analysis_results(db, dataset_id, df)
+            if analysis_results is None:
+                analyzer = DataQualityAnalyzer()
+                analysis_results = analyzer.analyze_dataset(df, CLEANING_ANALYSIS_SECTIONS)
 
             # Run cleaning
             cleaner = AutoDataCleaner()
@@ -72,6 +72,9 @@ class CleaningService:
             # Save cleaned dataset
             from app.core.config import settings
             output_filename = f"cleaned_{dataset.filename}"
+            if cleaned_df.size > settings.CLEANED_PARQUET_MIN_CELLS:
+                # Large outputs skip text formatting: Parquet writes columns in bulk
+                output_filename = os.path.splitext(output_filename)[0] + ".parquet"
             output_path = os.path.join(settings.UPLOAD_DIR, output_filename)
 
             # Ensure directory exists
@@ -80,10 +83,10 @@ class CleaningService:
 
             # Get cleaning summary
             cleaning_summary = cleaner.get_cleaning_summary()
-            cleaning_summary["cleaned_data_preview"] = cleaned_df.head(10).to_dict('records')
+            cleaning_summary["cleaned_data_preview"] = DatasetService.frame_preview(cleaned_df)
 
             # Convert results to JSON-serializable format
-            serializable_summary = CleaningService._make_json_serializable(cleaning_summary)
+            serializable_summary = to_jsonable(cleaning_summary)
 
             # Update job with results
             job.status = "completed"
@@ -116,6 +119,8 @@ class CleaningService:
             except Exception as ex:
                 print(f"Failed to update job error: {ex}")
                 db.rollback()
+        finally:
+            db.close()
 
     @staticmethod
     def clean_dataset_sync(file_path: str):
@@ -125,7 +130,7 @@ class CleaningService:
 
         # Run analysis first
         analyzer = DataQualityAnalyzer()
-        analysis_results = analyzer.analyze_dataset(df)
+        analysis_results = analyzer.analyze_dataset(df, CLEANING_ANALYSIS_SECTIONS)
 
         # Run cleaning
         cleaner = AutoDataCleaner()
@@ -133,6 +138,7 @@ class CleaningService:
 
         # Get cleaning summary
         cleaning_summary = cleaner.get_cleaning_summary()
-        cleaning_summary["cleaned_data_preview"] = cleaned_df.head(10).to_dict('records')
+        cleaning_summary["cleaned_data_preview"] = DatasetService.frame_preview(cleaned_df)
 
-        return cleaning_summary
+        # Plain JSON types, as the endpoint's default encoding expects
+        return to_jsonable(cleaning_summary)
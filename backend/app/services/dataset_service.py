@@ -1,58 +1,284 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import hashlib
+import importlib.util
 import os
-from typing import Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+# calamine (Rust) is much faster than openpyxl and also reads legacy .xls;
+# only probed here, pandas imports it on the first Excel read
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+# Codec for every Parquet file written: zstd level 3 compresses close to
+# brotli at roughly snappy's CPU cost
+PARQUET_COMPRESSION = "zstd"
+PARQUET_COMPRESSION_LEVEL = 3
+# Rows per frame when a file is read in chunks
+CHUNK_ROWS = 100_000
+
+# get_file_info results keyed by (path, mtime_ns, size) (LRU)
+FILE_INFO_CACHE_SIZE = 256
+_file_info_cache: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+
+
+def _dtype_backend(arrow_dtypes: bool) -> Dict[str, str]:
+    """Keyword arguments selecting Arrow-backed dtypes in a pandas reader."""
+    return {"dtype_backend": "pyarrow"} if arrow_dtypes else {}
+
+
+# Extension -> reader(file_path, columns, cache_parquet, arrow_dtypes)
+READERS = {
+    '.csv': lambda path, columns, cache_parquet, arrow_dtypes: DatasetService.read_cached_csv(
+        path, columns, cache_parquet, arrow_dtypes
+    ),
+    '.xlsx': lambda path, columns, cache_parquet, arrow_dtypes: pd.read_excel(
+        path, usecols=columns, engine=EXCEL_ENGINE, **_dtype_backend(arrow_dtypes)
+    ),
+    '.xls': lambda path, columns, cache_parquet, arrow_dtypes: pd.read_excel(
+        path, usecols=columns, engine=EXCEL_ENGINE, **_dtype_backend(arrow_dtypes)
+    ),
+    '.parquet': lambda path, columns, cache_parquet, arrow_dtypes: DatasetService.read_parquet(
+        path, columns, arrow_dtypes
+    ),
+}
+# Extension -> writer(df, file_path)
+WRITERS = {
+    '.csv': lambda df, path: df.to_csv(path, index=False),
+    '.xlsx': lambda df, path: df.to_excel(path, index=False),
+    '.xls': lambda df, path: df.to_excel(path, index=False),
+    '.parquet': lambda df, path: df.to_parquet(
+        path, index=False,
+        compression=PARQUET_COMPRESSION, compression_level=PARQUET_COMPRESSION_LEVEL
+    ),
+}
 
 
 class DatasetService:
     """Service for handling dataset operations."""
 
     @staticmethod
-    def read_file(file_path: str) -> pd.DataFrame:
-        """Read dataset file based on extension."""
+    def content_hasher():
+        """Hasher used for Dataset.content_hash; feed it the raw file bytes."""
+        return hashlib.blake2b(digest_size=16)
+
+    @staticmethod
+    def read_file(file_path: str, cache_parquet: bool = True,
+                  columns: Optional[List[str]] = None, arrow_dtypes: bool = False) -> pd.DataFrame:
+        """
+        Read dataset file based on extension, optionally only the given columns.
+
+        CSVs are served from their Parquet copy when it is newer than the
+        CSV; otherwise, with cache_parquet, one is written in the background
+        after a full parse so later reads skip it.
+
+        With arrow_dtypes, columns come back Arrow-backed (pd.ArrowDtype):
+        strings without Python objects and integers with missing values
+        kept as integers. The cleaner and analyzer expect NumPy dtypes, so
+        only readers that don't feed them (e.g. previews) should ask for it.
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+
+        reader = READERS.get(file_extension)
+        if reader is None:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+        return reader(file_path, columns, cache_parquet, arrow_dtypes)
+
+    @staticmethod
+    def read_cached_csv(file_path: str, columns: Optional[List[str]] = None,
+                        cache_parquet: bool = True, arrow_dtypes: bool = False) -> pd.DataFrame:
+        """Read a CSV, from its Parquet copy when that is current."""
+        parquet_path = file_path + ".parquet"
+        if DatasetService._is_newer(parquet_path, file_path):
+            return DatasetService.read_parquet(parquet_path, columns, arrow_dtypes)
+        df = DatasetService.read_csv(file_path, columns, arrow_dtypes)
+        # Only full NumPy-backed frames are cached; Arrow dtypes would be
+        # restored from the Parquet metadata on every later read
+        if cache_parquet and columns is None and not arrow_dtypes:
+            threading.Thread(
+                target=DatasetService.write_parquet_copy, args=(df, file_path), daemon=True
+            ).start()
+        return df
+
+    @staticmethod
+    def read_file_chunks(file_path: str, rows_per_chunk: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Read a dataset file as consecutive frames of at most rows_per_chunk rows.
+
+        Peak memory is bounded by the chunk size for CSV and Parquet, read
+        row group by row group; Excel files are read whole as one chunk.
+        """
         file_extension = os.path.splitext(file_path)[1].lower()
 
         if file_extension == '.csv':
-            return pd.read_csv(file_path)
+            parquet_path = file_path + ".parquet"
+            if DatasetService._is_newer(parquet_path, file_path):
+                yield from DatasetService.read_file_chunks(parquet_path, rows_per_chunk)
+            else:
+                yield from pd.read_csv(file_path, chunksize=rows_per_chunk)
         elif file_extension in ['.xlsx', '.xls']:
-            return pd.read_excel(file_path)
+            yield pd.read_excel(file_path, engine=EXCEL_ENGINE)
         elif file_extension == '.parquet':
-            return pd.read_parquet(file_path)
+            parquet_file = pq.ParquetFile(file_path, memory_map=settings.PARQUET_MEMORY_MAP)
+            for batch in parquet_file.iter_batches(batch_size=rows_per_chunk):
+                yield batch.to_pandas()
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
 
+    @staticmethod
+    def _is_newer(path: str, than_path: str) -> bool:
+        """Whether path exists and was modified no earlier than than_path."""
+        try:
+            return os.path.getmtime(path) >= os.path.getmtime(than_path)
+        except OSError:
+            return False
+
+    @staticmethod
+    def read_csv(file_path: str, columns: Optional[List[str]] = None,
+                 arrow_dtypes: bool = False) -> pd.DataFrame:
+        """Read a CSV with pandas' C parser."""
+        # Not the pyarrow engine: it infers dates and timestamps (object columns
+        # of datetime.date, datetime64) where the analyzer expects strings
+        return pd.read_csv(file_path, usecols=columns, **_dtype_backend(arrow_dtypes))
+
+    @staticmethod
+    def read_parquet(file_path: str, columns: Optional[List[str]] = None,
+                     arrow_dtypes: bool = False) -> pd.DataFrame:
+        """Read a Parquet file, or only the given columns, memory-mapped unless disabled in settings."""
+        table = pq.read_table(file_path, columns=columns, memory_map=settings.PARQUET_MEMORY_MAP)
+        # One block per column, each Arrow buffer released once its column is
+        # converted, so the table and the frame are never both held in full
+        return table.to_pandas(
+            self_destruct=True, split_blocks=True,
+            types_mapper=pd.ArrowDtype if arrow_dtypes else None
+        )
+
+    @staticmethod
+    def read_dataset(dataset) -> pd.DataFrame:
+        """Read a Dataset record, preferring its columnar Parquet copy over the upload."""
+        if dataset.parquet_path and os.path.exists(dataset.parquet_path):
+            return DatasetService.read_parquet(dataset.parquet_path)
+        return DatasetService.read_file(dataset.file_path)
+
     @staticmethod
     def save_file(df: pd.DataFrame, file_path: str, file_type: str = None):
         """Save dataset to file."""
         if file_type is None:
             file_type = os.path.splitext(file_path)[1].lower()
 
-        if file_type == '.csv':
-            df.to_csv(file_path, index=False)
-        elif file_type in ['.xlsx', '.xls']:
-            df.to_excel(file_path, index=False)
-        elif file_type == '.parquet':
-            df.to_parquet(file_path, index=False)
-        else:
+        writer = WRITERS.get(file_type)
+        if writer is None:
             raise ValueError(f"Unsupported file type: {file_type}")
+        writer(df, file_path)
+
+    @staticmethod
+    def write_parquet_copy(df: pd.DataFrame, file_path: str) -> Optional[str]:
+        """Write a Parquet copy next to an uploaded file; None if the data can't be stored."""
+        parquet_path = file_path + ".parquet"
+        # Written under a private name and renamed, so readers never see a partial file
+        tmp_path = f"{parquet_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            WRITERS['.parquet'](df, tmp_path)
+            os.replace(tmp_path, parquet_path)
+        except Exception:
+            # e.g. object columns with mixed types Arrow can't represent
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        return parquet_path
+
+    @staticmethod
+    def read_preview(parquet_path: str, n_rows: int = 10) -> List[Dict[str, Any]]:
+        """Read the first rows of a Parquet file without loading the rest."""
+        batch = next(pq.ParquetFile(parquet_path).iter_batches(batch_size=n_rows), None)
+        return batch.to_pylist() if batch is not None else []
+
+    @staticmethod
+    def frame_preview(df: pd.DataFrame, n_rows: int = 10) -> List[Dict[str, Any]]:
+        """First rows of a frame as records, converted column-wise through Arrow."""
+        head = df.head(n_rows)
+        try:
+            return pa.Table.from_pandas(head, preserve_index=False).to_pylist()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # e.g. object columns with mixed types Arrow can't represent
+            return head.to_dict('records')
 
     @staticmethod
     def get_file_info(file_path: str) -> Dict[str, Any]:
         """Get basic file information."""
-        if not os.path.exists(file_path):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        file_size = os.path.getsize(file_path)
+        # A rewritten file changes mtime or size, so stale entries are never hit
+        cache_key = (file_path, stat.st_mtime_ns, stat.st_size)
+        if cache_key in _file_info_cache:
+            _file_info_cache.move_to_end(cache_key)
+            return _file_info_cache[cache_key]
+
+        file_size = stat.st_size
         file_extension = os.path.splitext(file_path)[1].lower()
 
-        # Read file to get basic info
-        df = DatasetService.read_file(file_path)
+        if file_extension == '.parquet':
+            row_count, dtypes = DatasetService._parquet_shape(file_path)
+        else:
+            # Scanned a chunk at a time, so memory stays bounded for large CSVs
+            row_count, dtypes = DatasetService._chunked_shape(file_path)
 
-        return {
+        info = {
             "file_path": file_path,
             "file_size": file_size,
             "file_extension": file_extension,
-            "row_count": len(df),
-            "column_count": len(df.columns),
-            "columns": list(df.columns),
-            "dtypes": df.dtypes.to_dict()
+            "row_count": row_count,
+            "column_count": len(dtypes),
+            "columns": list(dtypes.index),
+            # Strings, so Arrow and NumPy dtypes alike serialize to JSON
+            "dtypes": dtypes.astype(str).to_dict()
         }
+
+        _file_info_cache[cache_key] = info
+        if len(_file_info_cache) > FILE_INFO_CACHE_SIZE:
+            _file_info_cache.popitem(last=False)
+
+        return info
+
+    @staticmethod
+    def _parquet_shape(file_path: str) -> Tuple[int, pd.Series]:
+        """Row count and pandas dtypes from the Parquet footer; no column data is read."""
+        parquet_file = pq.ParquetFile(file_path)
+        # An empty table converts with the same pandas metadata as a full read
+        empty = parquet_file.schema_arrow.empty_table().to_pandas()
+        return parquet_file.metadata.num_rows, empty.dtypes
+
+    @staticmethod
+    def _chunked_shape(file_path: str, rows_per_chunk: int = CHUNK_ROWS) -> Tuple[int, pd.Series]:
+        """Row count and dtypes of a dataset file, read a chunk at a time."""
+        row_count = 0
+        chunk_dtypes = []
+        for chunk in DatasetService.read_file_chunks(file_path, rows_per_chunk):
+            row_count += len(chunk)
+            chunk_dtypes.append(chunk.dtypes)
+
+        if not chunk_dtypes:
+            # Only a header-only CSV yields no chunks
+            return 0, pd.read_csv(file_path, nrows=0).dtypes
+
+        # Chunks can disagree: mixed ints and floats widen, anything else is object
+        return row_count, pd.concat(chunk_dtypes, axis=1).apply(
+            lambda dtypes: DatasetService._common_dtype(list(dtypes)), axis=1
+        )
+
+    @staticmethod
+    def _common_dtype(dtypes: List[Any]) -> Any:
+        """The dtype pandas gives a column whose chunks parsed as the given dtypes."""
+        if len(set(dtypes)) == 1:
+            return dtypes[0]
+        if all(isinstance(dtype, np.dtype) and dtype.kind in 'iuf' for dtype in dtypes):
+            return np.result_type(*dtypes)
+        return np.dtype(object)
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.analysis_service import AnalysisService
+from app.services.cleaning_service import CleaningService
+
+logger = logging.getLogger(__name__)
+
+# Job type -> blocking handler taking (dataset_id, job_id)
+JOB_HANDLERS = {
+    "analyze": AnalysisService.run_analysis,
+    "clean": CleaningService.run_cleaning,
+}
+
+QUEUE_MAXSIZE = 256
+
+# (job_id, dataset_id, job_type); created on startup so it binds to the running loop
+job_queue: Optional["asyncio.Queue[Tuple[int, int, str]]"] = None
+
+# Handlers run in worker processes so CPU-bound analysis and cleaning neither
+# hold the API's GIL nor serialize on it; they take ids and open their own
+# session, so nothing large is pickled
+process_pool: Optional[ProcessPoolExecutor] = None
+process_pool_size = settings.MAX_WORKERS
+
+
+def _new_process_pool() -> ProcessPoolExecutor:
+    # Spawned, not forked: the parent has threads and open database connections
+    return ProcessPoolExecutor(
+        max_workers=process_pool_size, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+async def _worker():
+    """Pull jobs off the queue and run them one at a time in the process pool."""
+    global process_pool
+    loop = asyncio.get_running_loop()
+    while True:
+        job_id, dataset_id, job_type = await job_queue.get()
+        pool = process_pool
+        try:
+            await loop.run_in_executor(pool, JOB_HANDLERS[job_type], dataset_id, job_id)
+        except BrokenProcessPool:
+            # A worker process died (e.g. out of memory); later jobs get a fresh pool
+            logger.exception("Job %s (%s) killed its worker process", job_id, job_type)
+            if process_pool is pool:
+                process_pool = _new_process_pool()
+        except Exception:
+            logger.exception("Job %s (%s) crashed", job_id, job_type)
+        finally:
+            job_queue.task_done()
+
+
+def start_workers(num_workers: int = None) -> List[asyncio.Task]:
+    """Create the job queue, its process pool and a fixed pool of worker tasks."""
+    global job_queue, process_pool, process_pool_size
+    num_workers = num_workers or settings.MAX_WORKERS
+    job_queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+    process_pool_size = num_workers
+    process_pool = _new_process_pool()
+    return [asyncio.create_task(_worker()) for _ in range(num_workers)]
+
+
+async def stop_workers(workers: List[asyncio.Task]):
+    """Cancel the worker pool; jobs still queued are left pending."""
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    if process_pool is not None:
+        process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def enqueue_job(job_id: int, dataset_id: int, job_type: str):
+    """Queue a job, waiting for a free slot if the queue is full."""
+    if job_queue is None:
+        raise RuntimeError("Job workers are not running")
+    await job_queue.put((job_id, dataset_id, job_type))
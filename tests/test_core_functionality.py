@@ -6,6 +6,7 @@ This script tests the core ML components without the problematic libraries.
 
 import sys
 import os
+import importlib.util
 import pandas as pd
 import numpy as np
 
@@ -133,12 +134,12 @@ def test_dependencies():
         'matplotlib', 'seaborn', 'joblib', 'tqdm'
     ]
 
+    # Locate each package without running its import-time code
     failed = []
     for dep in dependencies:
-        try:
-            __import__(dep)
+        if importlib.util.find_spec(dep) is not None:
             print(f"✅ {dep}")
-        except ImportError:
+        else:
             print(f"❌ {dep}")
             failed.append(dep)
 
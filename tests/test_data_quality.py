@@ -6,6 +6,8 @@ This script will help you understand what issues exist in each dataset.
 
 import sys
 import os
+import io
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -13,50 +15,59 @@ from pathlib import Path
 # Add the backend directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-def analyze_dataset_quality(file_path, dataset_name):
-    """Analyze the quality issues in a dataset."""
-    print(f"\n{'='*60}")
-    print(f"ANALYZING: {dataset_name}")
-    print(f"File: {file_path}")
-    print(f"{'='*60}")
+def analyze_dataset_quality(file_path, dataset_name, out=None):
+    """Analyze the quality issues in a dataset, writing the report to out (stdout by default)."""
+    print(f"\n{'='*60}", file=out)
+    print(f"ANALYZING: {dataset_name}", file=out)
+    print(f"File: {file_path}", file=out)
+    print(f"{'='*60}", file=out)
 
     try:
         # Read the dataset
         df = pd.read_csv(file_path)
-        print(f"📊 Dataset Shape: {df.shape[0]} rows × {df.shape[1]} columns")
+        print(f"📊 Dataset Shape: {df.shape[0]} rows × {df.shape[1]} columns", file=out)
 
         # Basic info
-        print(f"\n📋 Columns: {list(df.columns)}")
+        print(f"\n📋 Columns: {list(df.columns)}", file=out)
 
         # Missing data analysis
         missing_data = df.isnull().sum()
         missing_pct = (missing_data / len(df)) * 100
 
-        print(f"\n🔍 MISSING DATA ANALYSIS:")
-        print(f"Total missing values: {missing_data.sum()}")
-        print(f"Missing data percentage: {(missing_data.sum() / df.size) * 100:.2f}%")
+        print(f"\n🔍 MISSING DATA ANALYSIS:", file=out)
+        print(f"Total missing values: {missing_data.sum()}", file=out)
+        print(f"Missing data percentage: {(missing_data.sum() / df.size) * 100:.2f}%", file=out)
 
         if missing_data.sum() > 0:
-            print("\nColumns with missing data:")
+            print("\nColumns with missing data:", file=out)
             for col, count in missing_data[missing_data > 0].items():
-                print(f"  • {col}: {count} missing ({missing_pct[col]:.1f}%)")
+                print(f"  • {col}: {count} missing ({missing_pct[col]:.1f}%)", file=out)
 
         # Duplicate analysis
         duplicates = df.duplicated().sum()
         if duplicates > 0:
-            print(f"\n🔄 DUPLICATES: {duplicates} duplicate rows found")
+            print(f"\n🔄 DUPLICATES: {duplicates} duplicate rows found", file=out)
             duplicate_rows = df[df.duplicated(keep=False)]
-            print(f"   Duplicate row indices: {duplicate_rows.index.tolist()}")
+            print(f"   Duplicate row indices: {duplicate_rows.index.tolist()}", file=out)
 
         # Data type issues
-        print(f"\n📊 DATA TYPES:")
+        print(f"\n📊 DATA TYPES:", file=out)
         for col, dtype in df.dtypes.items():
-            print(f"  • {col}: {dtype}")
+            print(f"  • {col}: {dtype}", file=out)
 
         # Outliers and anomalies
-        print(f"\n⚠️  POTENTIAL ISSUES DETECTED:")
+        print(f"\n⚠️  POTENTIAL ISSUES DETECTED:", file=out)
         issues_found = []
 
+        # IQR fences, outlier counts and negative-value flags for all numeric columns at once
+        numeric_df = df.select_dtypes(include=np.number)
+        quartiles = numeric_df.quantile([0.25, 0.75])
+        IQR = quartiles.loc[0.75] - quartiles.loc[0.25]
+        lower_bound = quartiles.loc[0.25] - 1.5 * IQR
+        upper_bound = quartiles.loc[0.75] + 1.5 * IQR
+        outlier_counts = (numeric_df.lt(lower_bound) | numeric_df.gt(upper_bound)).sum()
+        has_negative = numeric_df.lt(0).any()
+
         for col in df.columns:
             col_issues = []
 
@@ -65,46 +76,35 @@ def analyze_dataset_quality(file_path, dataset_name):
                 unique_values = df[col].dropna().astype(str)
                 if len(unique_values) > 0:
                     # Check for inconsistent casing
-                    case_variations = set()
-                    for val in unique_values:
-                        case_variations.add(val.lower())
-                    if len(case_variations) < len(unique_values.unique()):
+                    if unique_values.str.lower().nunique() < unique_values.nunique():
                         col_issues.append("Inconsistent text casing")
 
                     # Check for empty strings
-                    if any(val.strip() == '' for val in unique_values):
+                    if unique_values.str.strip().eq('').any():
                         col_issues.append("Empty strings found")
 
             # Check for outliers in numeric columns
-            elif pd.api.types.is_numeric_dtype(df[col]):
-                numeric_data = df[col].dropna()
-                if len(numeric_data) > 0:
-                    # Check for negative values where they shouldn't be
-                    if col.lower() in ['age', 'price', 'quantity', 'salary', 'income', 'cost'] and (numeric_data < 0).any():
-                        col_issues.append("Negative values in typically positive field")
-
-                    # Check for extreme values
-                    Q1 = numeric_data.quantile(0.25)
-                    Q3 = numeric_data.quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    outliers = numeric_data[(numeric_data < lower_bound) | (numeric_data > upper_bound)]
-                    if len(outliers) > 0:
-                        col_issues.append(f"{len(outliers)} statistical outliers")
+            elif col in numeric_df.columns:
+                # Check for negative values where they shouldn't be
+                if col.lower() in ['age', 'price', 'quantity', 'salary', 'income', 'cost'] and has_negative[col]:
+                    col_issues.append("Negative values in typically positive field")
+
+                # Check for extreme values
+                if outlier_counts[col] > 0:
+                    col_issues.append(f"{outlier_counts[col]} statistical outliers")
 
             if col_issues:
                 issues_found.append(f"  • {col}: {', '.join(col_issues)}")
 
         if issues_found:
             for issue in issues_found:
-                print(issue)
+                print(issue, file=out)
         else:
-            print("  ✅ No obvious data quality issues detected")
+            print("  ✅ No obvious data quality issues detected", file=out)
 
         # Sample problematic rows
-        print(f"\n🔍 SAMPLE DATA (first 3 rows):")
-        print(df.head(3).to_string())
+        print(f"\n🔍 SAMPLE DATA (first 3 rows):", file=out)
+        print(df.head(3).to_string(), file=out)
 
         return {
             'shape': df.shape,
@@ -115,7 +115,7 @@ def analyze_dataset_quality(file_path, dataset_name):
         }
 
     except Exception as e:
-        print(f"❌ Error analyzing {dataset_name}: {e}")
+        print(f"❌ Error analyzing {dataset_name}: {e}", file=out)
         return None
 
 def main():
@@ -134,13 +134,24 @@ def main():
 
     results = {}
 
-    for file_path, name in datasets:
-        # Adjust path to be relative to project root
-        full_path = Path(os.path.join(os.path.dirname(__file__), '..', file_path))
-        if full_path.exists():
-            results[name] = analyze_dataset_quality(full_path, name)
-        else:
-            print(f"\n❌ File not found: {file_path}")
+    # Datasets are independent; analyze them concurrently (pandas and pyarrow
+    # release the GIL while parsing and computing) and print each report in order
+    with ThreadPoolExecutor(max_workers=len(datasets)) as executor:
+        reports = {}
+        for file_path, name in datasets:
+            # Adjust path to be relative to project root
+            full_path = Path(os.path.join(os.path.dirname(__file__), '..', file_path))
+            if full_path.exists():
+                out = io.StringIO()
+                reports[name] = (out, executor.submit(analyze_dataset_quality, full_path, name, out))
+
+        for file_path, name in datasets:
+            if name in reports:
+                out, future = reports[name]
+                results[name] = future.result()
+                print(out.getvalue(), end='')
+            else:
+                print(f"\n❌ File not found: {file_path}")
 
     # Summary
     print(f"\n{'='*60}")
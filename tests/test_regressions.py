@@ -0,0 +1,226 @@
+"""
+Regression tests for backend services and ML components.
+"""
+
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+# Settings require a secret key; tests never use it
+os.environ.setdefault("SECRET_KEY", "test")
+
+
+def test_read_file_keeps_date_columns_as_strings(tmp_path):
+    """CSV date columns stay object strings, so the analyzer's string checks run."""
+    from app.services.dataset_service import DatasetService
+    from app.ml.data_analyzer import DataQualityAnalyzer
+
+    csv_path = tmp_path / "dates.csv"
+    pd.DataFrame({
+        "day": ["2024-01-01", "2024-01-02", None, "2024-01-04"],
+        "stamp": ["2024-01-01 10:00:00", "2024-01-02 11:30:00", "2024-01-03 12:00:00", None],
+        "name": ["a", None, "c", "d"],
+        "value": [1.0, 2.0, 3.0, 4.0],
+    }).to_csv(csv_path, index=False)
+
+    df = DatasetService.read_file(str(csv_path), cache_parquet=False)
+
+    assert df["day"].dtype == object
+    assert df["stamp"].dtype == object
+    assert isinstance(df["day"].dropna().iloc[0], str)
+    assert df["name"].isna().sum() == 1 and isinstance(df["name"].iloc[1], float)
+
+    # Reported file info matches what read_file returns
+    info = DatasetService.get_file_info(str(csv_path))
+    assert info["dtypes"] == df.dtypes.astype(str).to_dict()
+
+    results = DataQualityAnalyzer().analyze_dataset(df)
+    assert "quality_score" in results
+
+
+def test_knn_impute_matches_sklearn():
+    """The KNN kernel fills the same values as KNNImputer, for all or some columns."""
+    from sklearn.impute import KNNImputer
+    from app.ml._kernels import knn_impute
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(80, 4))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    # A row with nothing to compare against takes the column means
+    values[0] = [np.nan, np.nan, np.nan, 1.0]
+    values[1:, 3] = np.nan
+
+    expected = KNNImputer(n_neighbors=5, keep_empty_features=True).fit_transform(values)
+    for targets in (np.arange(4), np.array([2, 0])):
+        imputed = knn_impute(np.ascontiguousarray(values), targets, 5)
+        np.testing.assert_allclose(imputed, expected[:, targets])
+
+
+def test_analyzer_exact_duplicates_compare_values():
+    """Duplicate counts follow value equality, not the row hashes used to find candidates."""
+    from app.ml.data_analyzer import DataQualityAnalyzer
+
+    # 1 and "1" hash alike but differ; -0.0 and 0.0 hash apart but are equal
+    df = pd.DataFrame({
+        "key": [1, "1", 2, 2],
+        "value": [0.0, 0.0, -0.0, 0.0],
+    })
+
+    duplicates = DataQualityAnalyzer().analyze_dataset(df, ["duplicates"])["duplicates"]
+    assert duplicates["exact_duplicates"] == df.duplicated().sum() == 1
+    assert duplicates["duplicate_rows"] == df.duplicated(keep=False).sum() == 2
+
+
+def test_clean_dataset_caps_outliers_in_float_only_frames(tmp_path):
+    """Float columns sharing one block are capped without touching the input frame."""
+    from app.services.dataset_service import DatasetService
+    from app.ml.data_cleaner import AutoDataCleaner
+
+    # Text plus floats only: pandas keeps both float columns in one block
+    csv_path = tmp_path / "prices.csv"
+    pd.DataFrame({
+        "name": [f"item {i}" for i in range(20)],
+        "price": [10.0 + i for i in range(19)] + [1000.0],
+        "score": [0.5] * 20,
+    }).to_csv(csv_path, index=False)
+    df = DatasetService.read_file(str(csv_path), cache_parquet=False)
+    original = df.copy()
+
+    cleaner = AutoDataCleaner()
+    cleaner.clean_dataset(df, {"outliers": {}})
+    pd.testing.assert_frame_equal(df, original)
+    treatment = cleaner.cleaning_results["outlier_treatment"]
+    assert treatment["outliers_capped"] == 1
+    assert treatment["columns_processed"] == ["price"]
+
+    with pd.option_context("mode.copy_on_write", True):
+        capped = cleaner._handle_outliers(df, {"outliers": {}}, ["price", "score"])
+    q1, q3 = df["price"].quantile([0.25, 0.75])
+    assert capped["price"].iloc[-1] == q3 + 1.5 * (q3 - q1)
+    assert capped["price"].iloc[:-1].tolist() == original["price"].iloc[:-1].tolist()
+    assert capped["score"].tolist() == original["score"].tolist()
+    pd.testing.assert_frame_equal(df, original)
+
+
+def test_clip_outliers_matches_numpy_on_single_block_frame():
+    """The clipping kernel counts and clips like the NumPy fallback on a copied float block."""
+    from app.ml._kernels import clip_outliers
+
+    rng = np.random.default_rng(1)
+    # Built from one 2-D array, so all columns share a single float64 block
+    df = pd.DataFrame(rng.normal(size=(200, 3)) * [1, 10, 100], columns=["a", "b", "c"])
+    df.iloc[::17, 1] = np.nan
+    original = df.copy()
+    # NaN bounds (an all-missing column) never clip
+    lower = np.array([-1.0, -10.0, np.nan])
+    upper = np.array([1.0, 10.0, np.nan])
+
+    values = np.array(df.to_numpy(dtype=np.float64, na_value=np.nan), order="F", copy=True)
+    expected = values.copy(order="F")
+    mask = (expected < lower) | (expected > upper)
+    np.clip(expected, lower, upper, out=expected, where=mask)
+
+    counts = clip_outliers(values, lower, upper)
+    np.testing.assert_array_equal(counts, mask.sum(axis=0))
+    np.testing.assert_array_equal(values, expected)
+    pd.testing.assert_frame_equal(df, original)
+
+
+def test_upgrade_schema_indexes_existing_jobs_table(tmp_path):
+    """Startup creates model indexes missing from a database whose tables already exist."""
+    from sqlalchemy import create_engine, inspect, text
+    from app.core.database import Base, upgrade_schema
+    from app.models.dataset import Dataset  # noqa: F401 (registers the table)
+    from app.models.processing_job import ProcessingJob  # noqa: F401
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'existing.db'}")
+    # A database created before the composite job index was declared
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_jobs_ds_type_status_created"))
+
+    def job_indexes():
+        return {index["name"] for index in inspect(engine).get_indexes("processing_jobs")}
+
+    assert "ix_jobs_ds_type_status_created" not in job_indexes()
+    # Startup: create_all leaves existing tables alone, upgrade_schema fills the gap
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    assert "ix_jobs_ds_type_status_created" in job_indexes()
+    # Safe to rerun
+    upgrade_schema(engine)
+
+
+def test_chunked_reads_match_a_full_read(tmp_path):
+    """Chunks concatenate to the full frame, and the chunked shape scan widens dtypes like it."""
+    from app.services.dataset_service import DatasetService
+
+    # "amount" is integral in the first chunk and fractional in the second
+    csv_path = tmp_path / "amounts.csv"
+    csv_path.write_text("amount,label\n1,a\n2,b\n3.5,c\n,d\n5,e\n")
+    df = DatasetService.read_file(str(csv_path), cache_parquet=False)
+
+    chunks = list(DatasetService.read_file_chunks(str(csv_path), rows_per_chunk=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+
+    row_count, dtypes = DatasetService._chunked_shape(str(csv_path), rows_per_chunk=2)
+    assert row_count == len(df)
+    pd.testing.assert_series_equal(dtypes, df.dtypes)
+
+
+def test_numeric_sections_read_only_numeric_columns(tmp_path):
+    """Numeric-only sections read just the numeric columns and report the same results."""
+    from app.services.analysis_service import AnalysisService
+    from app.services.dataset_service import DatasetService
+    from app.ml.data_analyzer import DataQualityAnalyzer
+
+    rng = np.random.default_rng(2)
+    parquet_path = tmp_path / "mixed.parquet"
+    pd.DataFrame({
+        "x": rng.normal(size=50),
+        "label": ["a", "b"] * 25,
+        "n": rng.integers(0, 10, size=50),
+        "flag": [True, False] * 25,
+    }).to_parquet(parquet_path, index=False)
+    dtypes = DatasetService.get_file_info(str(parquet_path))["dtypes"]
+
+    sections = ["outliers", "distributions", "correlations"]
+    assert DataQualityAnalyzer.columns_needed(dtypes, sections) == ["x", "n"]
+    assert DataQualityAnalyzer.columns_needed(dtypes, ["missing_data"]) is None
+    assert DataQualityAnalyzer.columns_needed(dtypes) is None
+
+    projected = AnalysisService.analyze_dataset_sync(
+        str(parquet_path), sections=sections, column_dtypes=dtypes
+    )
+    full = AnalysisService.analyze_dataset_sync(str(parquet_path), sections=sections)
+    assert projected == full
+
+
+def test_arrow_backed_preview_matches_parquet_preview(tmp_path):
+    """Previews read with Arrow dtypes keep integers and nulls, like the Parquet-copy preview."""
+    from app.services.dataset_service import DatasetService
+
+    csv_path = tmp_path / "people.csv"
+    csv_path.write_text("age,name\n31,Ann\n,Bob\n45,\n")
+
+    df = DatasetService.read_file(str(csv_path), arrow_dtypes=True)
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    # Arrow-backed reads never become the shared Parquet copy
+    assert not os.path.exists(str(csv_path) + ".parquet")
+
+    preview = DatasetService.frame_preview(df)
+    assert preview == [
+        {"age": 31, "name": "Ann"},
+        {"age": None, "name": "Bob"},
+        {"age": 45, "name": None},
+    ]
+    assert isinstance(preview[0]["age"], int)
+
+    parquet_path = DatasetService.write_parquet_copy(
+        DatasetService.read_file(str(csv_path), cache_parquet=False), str(csv_path)
+    )
+    assert DatasetService.read_preview(parquet_path) == preview